@@ -0,0 +1,92 @@
+from mock import Mock, call
+from pytest import mark
+
+from conftest import SCALES, LARGE_SCALE, create_recorded_mock, get_distinct_calls
+from letz.aliases import when, magic_call, verify, times, in_order, instance_of, verify_no_more_interactions, recorded
+
+
+@mark.parametrize('stubs_count', SCALES)
+def bench_side_effect_exact_lookup(benchmark, stubs_count):
+    mock_instance = Mock()
+    for index in range(stubs_count):
+        when(mock_instance).has_a_call(call.method(index, key=str(index))).then_return(index)
+
+    benchmark(mock_instance.method, stubs_count // 2, key=str(stubs_count // 2))
+
+
+@mark.parametrize('stubs_count', SCALES)
+def bench_side_effect_matcher_lookup(benchmark, stubs_count):
+    mock_instance = Mock()
+    when(mock_instance).has_a_call(call.method(instance_of(int), key=instance_of(str))).then_return(-1)
+    for index in range(stubs_count):
+        when(mock_instance).has_a_call(call.method(index, key=str(index))).then_return(index)
+
+    benchmark(mock_instance.method, -1, key='missing')
+
+
+@mark.parametrize('calls_count', SCALES)
+def bench_had_called_with(benchmark, calls_count):
+    mock_instance = recorded(Mock())
+    for index in range(calls_count):
+        mock_instance.method(index)
+
+    benchmark(lambda: verify(mock_instance, times(1)).had_called_with(call.method(0)))
+
+
+@mark.parametrize('calls_count', SCALES)
+def bench_had_called_with_unrecorded(benchmark, calls_count):
+    mock_instance = Mock()
+    for index in range(calls_count):
+        mock_instance.method(index)
+
+    benchmark(lambda: verify(mock_instance, times(1)).had_called_with(call.method(0)))
+
+
+def bench_verify_no_more_interactions(benchmark):
+    def verify_all():
+        mock_instance = create_recorded_mock(LARGE_SCALE)
+        for verified_call in get_distinct_calls():
+            verify(mock_instance, times(LARGE_SCALE // 100)).had_called_with(verified_call)
+        verify_no_more_interactions(mock_instance)
+
+    benchmark.pedantic(verify_all, rounds=5)
+
+
+def bench_in_order(benchmark):
+    def verify_in_order():
+        first_mock, second_mock = recorded(Mock()), recorded(Mock())
+        in_order_mocks = in_order(first_mock, second_mock)
+        for index in range(LARGE_SCALE // 2):
+            first_mock.method(index)
+            second_mock.method(index)
+        for index in range(LARGE_SCALE // 2):
+            in_order_mocks.verify(first_mock).had_called_with(call.method(index))
+            in_order_mocks.verify(second_mock).had_called_with(call.method(index))
+
+    benchmark.pedantic(verify_in_order, rounds=5)
+
+
+def bench_bulk_stubbing(benchmark):
+    answers = dict((index, index * 2) for index in range(LARGE_SCALE))
+
+    benchmark(lambda: when(Mock()).has_calls('method', answers))
+
+
+def bench_chained_stubbing(benchmark):
+    def stub_one_by_one():
+        mock_instance = Mock()
+        for index in range(LARGE_SCALE):
+            when(mock_instance).has_a_call(call.method(index)).then_return(index * 2)
+
+    benchmark.pedantic(stub_one_by_one, rounds=5)
+
+
+def bench_deep_path_stubbing(benchmark):
+    mock_instance = Mock()
+    counter = iter(range(10 ** 7))
+
+    def stub():
+        index = next(counter)
+        when(mock_instance).has_a_call(magic_call.first.second.third.method(index)).then_return(index)
+
+    benchmark(stub)
@@ -0,0 +1,45 @@
+from pytest import fixture
+
+from letz.cassettes import Cassette, CassetteRecorder
+
+CALLS_COUNT = 20000
+
+
+class Service(object):
+    def fetch(self, key):
+        return {'key': key, 'payload': 'x' * 100}
+
+
+@fixture(scope='module')
+def cassette_path(tmp_path_factory):
+    recorder = CassetteRecorder(Service())
+    for key in range(CALLS_COUNT):
+        recorder.proxy.fetch(key)
+    cassette_path = str(tmp_path_factory.mktemp('cassettes') / 'service.cassette')
+    recorder.save(cassette_path)
+    return cassette_path
+
+
+def bench_cassette_save(benchmark, tmp_path):
+    recorder = CassetteRecorder(Service())
+    for key in range(CALLS_COUNT):
+        recorder.proxy.fetch(key)
+
+    benchmark.pedantic(recorder.save, args=(str(tmp_path / 'service.cassette'),), rounds=3)
+
+
+def bench_cassette_open(benchmark, cassette_path):
+    def open_cassette():
+        cassette = Cassette(cassette_path)
+        cassette.create_letz()
+        cassette.close()
+
+    benchmark(open_cassette)
+
+
+def bench_cassette_replay(benchmark, cassette_path):
+    cassette = Cassette(cassette_path)
+    service = cassette.create_letz()
+
+    benchmark(service.fetch, CALLS_COUNT // 2)
+    cassette.close()
@@ -0,0 +1,86 @@
+import threading
+
+from pytest import mark
+
+from conftest import LARGE_SCALE, measure_allocated
+from letz.core import LetzController, AnswerConfigurationAction
+
+
+def signed_model(first, second, key=None, *args, **kwargs):
+    pass
+
+
+def bench_letz_creation(benchmark):
+    letz_controller = LetzController()
+    benchmark.extra_info['bytes_per_letz'] = measure_allocated(
+        lambda: [letz_controller.create_letz() for _ in range(LARGE_SCALE)], LARGE_SCALE)
+
+    benchmark(letz_controller.create_letz)
+
+
+def bench_attribute_chain(benchmark):
+    def create_attribute_chain():
+        letz = LetzController().create_letz()
+        for _ in range(100):
+            letz = letz.attribute
+        return letz
+
+    benchmark(create_attribute_chain)
+
+
+def bench_existing_attribute(benchmark):
+    letz = LetzController().create_letz()
+    letz.some_attribute
+
+    benchmark(lambda: letz.some_attribute)
+
+
+def bench_unsigned_call(benchmark):
+    letz = LetzController().create_letz()
+
+    benchmark(letz, 1, 2, key=3)
+
+
+def bench_unsigned_call_with_stats(benchmark):
+    letz_controller = LetzController()
+    letz_controller.enable_stats()
+    letz = letz_controller.create_letz()
+
+    benchmark(letz, 1, 2, key=3)
+
+
+def bench_signed_call(benchmark):
+    letz = LetzController().create_singed_letz(signed_model)
+
+    benchmark(letz, 1, 2, key=3)
+
+
+@mark.parametrize('configurations_count', [1, 100, 10000])
+def bench_configured_answer(benchmark, configurations_count):
+    letz_controller = LetzController()
+    letz = letz_controller.create_letz()
+    engine = letz_controller.get_engine(letz)
+    for index in range(configurations_count):
+        engine._call_action = AnswerConfigurationAction(lambda *_, **__: index)
+        letz(index, key=str(index))
+
+    benchmark(letz, configurations_count // 2, key=str(configurations_count // 2))
+
+
+@mark.parametrize('threads_count', [1, 2, 4, 8])
+def bench_concurrent_calls(benchmark, threads_count):
+    letz = LetzController(concurrent=True).create_letz()
+    calls_per_thread = LARGE_SCALE // threads_count
+
+    def call_letz():
+        for index in range(calls_per_thread):
+            letz(index)
+
+    def call_in_threads():
+        threads = [threading.Thread(target=call_letz) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    benchmark.pedantic(call_in_threads, rounds=5)
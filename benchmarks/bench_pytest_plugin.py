@@ -0,0 +1,28 @@
+from letz.core import LetzController
+from letz.pytest_plugin import LetzControllerPool
+
+
+def build_graph(letz_controller):
+    tester = letz_controller.create_letz()
+    for index in range(20):
+        getattr(tester, 'attribute_{}'.format(index)).nested(index)
+
+
+def bench_fresh_controller(benchmark):
+    def run_test():
+        letz_controller = LetzController()
+        build_graph(letz_controller)
+        letz_controller.reset()
+
+    benchmark(run_test)
+
+
+def bench_pooled_controller(benchmark):
+    pool = LetzControllerPool()
+
+    def run_test():
+        letz_controller = pool.acquire()
+        build_graph(letz_controller)
+        pool.release(letz_controller)
+
+    benchmark(run_test)
@@ -0,0 +1,24 @@
+from pytest import mark
+
+from conftest import measure_allocated
+from letz.core import LetzController
+from letz.recording import KEEP_ALL, keep_compact
+
+CALLS_COUNT = 100000
+
+DISTINCT = 1000
+
+
+def record_calls(recording_policy):
+    letz_controller = LetzController(recording_policy=recording_policy)
+    letz = letz_controller.create_letz()
+    for index in range(CALLS_COUNT):
+        letz('event-{}'.format(index % DISTINCT), index % DISTINCT, source='replay')
+    return letz_controller, letz
+
+
+@mark.parametrize('recording_policy', [KEEP_ALL, keep_compact()], ids=['list', 'compact'])
+def bench_call_recording(benchmark, recording_policy):
+    benchmark.extra_info['bytes_per_call'] = measure_allocated(lambda: record_calls(recording_policy), CALLS_COUNT)
+
+    benchmark.pedantic(record_calls, args=(recording_policy,), rounds=3)
@@ -0,0 +1,55 @@
+"""
+pytest-benchmark suite of the letz hot paths, run from the repository root:
+
+    python -m pytest benchmarks                                  # measure
+    python -m pytest benchmarks --benchmark-save=baseline        # save a new baseline
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%
+                                                                 # compare to the latest saved run, fail on regressions
+    pytest-benchmark --storage benchmarks/.benchmarks compare --group-by=name
+                                                                 # report saved runs side by side
+
+Baselines are saved per machine under `benchmarks/.benchmarks`, compare runs made on the same machine only. Memory
+footprints are saved with the timings, as the `extra_info` of the benchmarks measuring them.
+"""
+import tracemalloc
+
+from mock import Mock, call
+from typing import Any, Callable
+
+from letz.aliases import recorded
+
+SCALES = [1, 100, 10000]
+
+LARGE_SCALE = SCALES[-1]
+
+METHODS = ('first', 'second')
+
+
+def create_recorded_mock(calls_count):
+    # type: (int) -> Mock
+    """
+    Records `calls_count` calls, made of 100 distinct calls.
+    """
+    mock_instance = recorded(Mock())
+    for index in range(calls_count):
+        getattr(mock_instance, METHODS[index % 2])(index % 100)
+    return mock_instance
+
+
+def get_distinct_calls():
+    # type: () -> list
+    return [getattr(call, METHODS[index % 2])(index) for index in range(100)]
+
+
+def measure_allocated(function, count):
+    # type: (Callable[[], Any], int) -> float
+    """
+    Returns the bytes allocated by `function` and still held by its result, per each of its `count` items.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = function()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / float(count)
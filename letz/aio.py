@@ -0,0 +1,116 @@
+import asyncio
+import selectors
+
+from typing import Optional
+
+from letz.clocks import VirtualClock
+from letz.core import CallableLetz, Call, LetzEngine, SimulatedAnswer
+
+
+class AwaitedCall(object):
+    __slots__ = ('call',)
+
+    def __init__(self, call):
+        # type: (Call) -> None
+        self.call = call
+
+    def __eq__(self, other):
+        return isinstance(other, AwaitedCall) and self.call == other.call
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((AwaitedCall, self.call))
+
+    def __repr__(self):
+        return '<await {!r}>'.format(self.call)
+
+
+class AwaitableAnswer(object):
+    """
+    The result of calling an `AsyncLetz`, resolved by the engine answer only once awaited.
+
+    Awaiting it doesn't schedule a task, it returns right away unless the engine has a latency, in which case it
+    sleeps on the running loop first. An answer simulated under a load model sleeps on the running loop as well, for
+    the time the model scheduled, so the model clock should be the loop clock.
+    """
+
+    __slots__ = ('engine', 'call')
+
+    def __init__(self, engine, call):
+        # type: (LetzEngine, Call) -> None
+        self.engine = engine
+        self.call = call
+
+    def __await__(self):
+        engine = self.engine
+        if engine.latency:
+            yield from asyncio.sleep(engine.latency).__await__()
+        answer = engine.answer
+        if isinstance(answer, SimulatedAnswer):
+            load_model = answer.load_model
+            deadline, failed = load_model.reserve()
+            delay = deadline - load_model.clock.time()
+            if delay > 0:
+                yield from asyncio.sleep(delay).__await__()
+            engine.log_call(AwaitedCall(self.call))
+            return load_model.complete(answer.answer, failed, self.call.args, self.call.kwargs)
+        engine.log_call(AwaitedCall(self.call))
+        return engine.get_answer(*self.call.args, **self.call.kwargs)
+
+
+class AsyncLetz(CallableLetz):
+    __slots__ = ()
+
+    def __call__(self, *args, **kwargs):
+        call = Call(*args, **kwargs)
+        self.__engine__.handle_call(call)
+        return AwaitableAnswer(self.__engine__, call)
+
+
+class VirtualTimeSelector(selectors.BaseSelector):
+    """
+    Selector which advances a virtual clock instead of waiting for timers.
+
+    Ready file objects are still polled, the selector only blocks when nothing is scheduled at all.
+    """
+
+    def __init__(self, clock):
+        # type: (VirtualClock) -> None
+        self.clock = clock
+        self.selector = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self.selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self.selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self.selector.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        if timeout is None:
+            return self.selector.select(None)
+
+        ready = self.selector.select(0)
+        if not ready and timeout > 0:
+            self.clock.advance(timeout)
+        return ready
+
+    def close(self):
+        self.selector.close()
+
+    def get_map(self):
+        return self.selector.get_map()
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock=None):
+        # type: (Optional[VirtualClock]) -> None
+        self.clock = clock or VirtualClock()
+        super(VirtualTimeEventLoop, self).__init__(VirtualTimeSelector(self.clock))
+
+    def time(self):
+        return self.clock.time()
@@ -1,12 +1,21 @@
 from mock import Mock
 
 from letz.arrangements import MagicCall, WhenModifier, CallsCountPredicate, ONLY_ONCE_PREDICATE, \
-    Verifier, get_mock_verified_calls, InOrder, TypePredicate, NEVER_PREDICATE
+    Verifier, InOrder, NEVER_PREDICATE, record_calls, get_unverified_calls, format_unverified_calls, \
+    RecordedCalls, COUNTED_CALLS
 from letz.exceptions import NoInteractionWanted, MocksException
+from letz.load import LoadModel, UniformLatency, ExponentialLatency, SampledLatency
+from letz.matchers import any_, eq, instance_of, gt, lt, contains, regex, arg_that, all_of, any_of, captor
+from letz.recording import RecordingPolicy, keep_last, keep_counts, keep_sample, keep_compact
 
 magic_call = MagicCall(from_kall=False)
 
 
+def recorded(mock_instance, recording_policy=COUNTED_CALLS):
+    # type: (Mock, RecordingPolicy) -> Mock
+    return record_calls(mock_instance, recording_policy)
+
+
 def when(mock_instance):
     # type: (Mock) -> WhenModifier
     return WhenModifier(mock_instance)
@@ -43,31 +52,23 @@ def verify(mock_instance, calls_count_verifier=ONLY_ONCE_PREDICATE):
 
 
 def verify_zero_interaction(mock_instance):
-    all_calls = list(mock_instance.mock_calls)
-    if all_calls:
+    recorded_calls = mock_instance.mock_calls
+    if isinstance(recorded_calls, RecordedCalls) and recorded_calls.multiset is not None:
+        calls_count = len(recorded_calls.multiset)
+    else:
+        calls_count = len(recorded_calls) + getattr(recorded_calls, 'discarded_count', 0)
+    if calls_count:
         raise NoInteractionWanted
 
 
 def verify_no_more_interactions(*mock_instances):
     for mock_instance in mock_instances:
-        verified_calls = get_mock_verified_calls(mock_instance)
-        all_calls = list(mock_instance.mock_calls)
-
-        for verified_call in verified_calls:
-            try:
-                all_calls.remove(verified_call)
-            except ValueError:
-                raise NoInteractionWanted()
-
-        if all_calls:
-            raise NoInteractionWanted()
+        unverified_calls = get_unverified_calls(mock_instance)
+        if unverified_calls:
+            raise NoInteractionWanted(format_unverified_calls(unverified_calls))
 
 
 def in_order(*mock_instances):
     if None in mock_instances:
         raise MocksException()
     return InOrder(*mock_instances)
-
-
-def instance_of(_type):
-    return TypePredicate(_type)
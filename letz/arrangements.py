@@ -1,10 +1,20 @@
+from heapq import merge
+from itertools import chain, count
+from operator import is_
+
 from mock import call, Mock
-from typing import List, Tuple, Any
+from mock.mock import _Call, _CallList
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 from letz.consts import DEFAULT
 from letz.exceptions import NeverWantedButInvoked, WantedButNotInvoked, \
     TooLittleActualInvocations, TooManyActualInvocations, VerificationInOrderFailure, MocksException, \
-    ArgumentsAreDifferent
+    ArgumentsAreDifferent, NoInteractionWanted
+from letz.indexes import CallIndex, MockCallMultiset
+from letz.load import LoadModel
+from letz.matchers import Matcher, TypePredicate, compile_call
+from letz.recording import CallLog, RecordingPolicy, KEEP_ALL
+from letz.sequences import AnswerSequence
 
 
 class CallsCountPredicate(object):
@@ -15,7 +25,7 @@ class CallsCountPredicate(object):
     def __call__(self, calls_count):
         if self.maximum == 0 and calls_count != 0:
             raise NeverWantedButInvoked()
-        if self.maximum > 0:
+        if self.maximum is None or self.maximum > 0:
             if calls_count == 0:
                 raise WantedButNotInvoked()
             if self.minimum and calls_count < self.minimum:
@@ -41,35 +51,102 @@ class MagicCall(call.__class__):
         return MagicCall((self.name, args, kwargs), name=name, parent=self)
 
     def __getattr__(self, attr):
-        if self.name is None:
-            return MagicCall(name=attr, from_kall=False)
-        name = '%s.%s' % (self.name, attr)
-        return MagicCall(name=name, parent=self, from_kall=False)
+        children = self.__dict__.setdefault('_magic_children', {})
+        child = children.get(attr)
+        if child is None:
+            if self.name is None:
+                child = MagicCall(name=attr, from_kall=False)
+            else:
+                child = MagicCall(name='%s.%s' % (self.name, attr), parent=self, from_kall=False)
+            children[attr] = child
+        return child
 
     def __str__(self):
         return self.__getattr__('__str__')()
 
 
+CALL_PATHS = {}  # type: Dict[str, Tuple[str, ...]]
+
+
+def get_call_path(name):
+    # type: (str) -> Tuple[str, ...]
+    path = CALL_PATHS.get(name)
+    if path is None:
+        path = CALL_PATHS[name] = tuple(name.split('.'))
+    return path
+
+
+class StubCounters(object):
+    """
+    Opt-in counters of a `SideEffect`: its calls, those which fell through to its default (misses), and the calls
+    answered by each of its stubbed calls (hits), counted by configuration.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.misses = 0
+        self.stubs = []  # type: List[Tuple[tuple, dict, Any]]
+        self.hits = {}  # type: Dict[Any, int]
+
+    def add(self, args, kwargs, configuration):
+        # type: (tuple, dict, Any) -> None
+        self.stubs.append((args, kwargs, configuration))
+        self.hits[configuration] = 0
+
+    def added(self, configurations):
+        # type: (Iterable[Tuple[tuple, dict, Any]]) -> Iterator[Tuple[tuple, dict, Any]]
+        for args, kwargs, configuration in configurations:
+            self.add(args, kwargs, configuration)
+            yield args, kwargs, configuration
+
+    def count(self, configuration):
+        # type: (Any) -> None
+        self.calls += 1
+        if configuration is None:
+            self.misses += 1
+        elif configuration in self.hits:
+            self.hits[configuration] += 1
+
+
 class SideEffect(object):
-    def __init__(self, default=DEFAULT):
-        self.configured_calls = []  # type: List[Tuple[Any, List]]
+    def __init__(self, default=DEFAULT, mock=None):
+        # type: (Any, Optional[Mock]) -> None
+        self.configured_calls = CallIndex()
         self.default = default
+        self.mock = mock
+        self.dropping_configurations = set()  # type: Set[AnswerSequence]
+        self.load_models = {}  # type: Dict[AnswerSequence, LoadModel]
+        self.counters = None  # type: Optional[StubCounters]
 
     def __call__(self, *args, **kwargs):
-        for configured_call, return_value in self.configured_calls:
-            if call(*args, **kwargs) == configured_call:
-                if len(return_value) > 1:
-                    return return_value.pop(0)(*args, **kwargs)
-                return return_value[0](*args, **kwargs)
-        return self.default
+        return_value = self.configured_calls.find(args, kwargs)
+        if self.counters is not None:
+            self.counters.count(return_value)
+        if return_value is None:
+            return self.default
+        if self.dropping_configurations and return_value in self.dropping_configurations:
+            drop_recorded_call(self.mock, args, kwargs)
+        if self.load_models and return_value in self.load_models:
+            return self.load_models[return_value].answer(return_value.next_value(), args, kwargs)
+        return return_value.next_value()(*args, **kwargs)
+
+
+def returning(value):
+    return lambda *args, **kwargs: value
 
 
 class SideEffectModifier(object):
-    def __init__(self, configurations):
+    def __init__(self, configurations, side_effect=None):
+        # type: (AnswerSequence, Optional[SideEffect]) -> None
         self.configurations = configurations
+        self.side_effect = side_effect
 
     def then_return(self, value):
-        self.configurations.append(lambda *args, **kwargs: value)
+        self.configurations.append(returning(value))
+        return self
+
+    def then_return_from(self, values):
+        self.configurations.extend(returning(value) for value in values)
         return self
 
     def then_raise(self, exception):
@@ -79,40 +156,331 @@ class SideEffectModifier(object):
         self.configurations.append(answer)
         return self
 
+    def under_load(self, load_model):
+        # type: (LoadModel) -> SideEffectModifier
+        """
+        Answers the configured call, whatever it was configured with before or after, under `load_model`.
+        """
+        self.side_effect.load_models[self.configurations] = load_model
+        return self
+
+
+class ReturnedValue(object):
+    """
+    Configuration of a call which keeps returning a single value, a lighter `AnswerSequence` for bulk stubbing.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def next_value(self):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self.value
+
+
+def get_stubbed_arguments(key):
+    # type: (Any) -> Tuple[tuple, dict]
+    if isinstance(key, _Call):
+        return key[-2], key[-1]
+    if isinstance(key, tuple):
+        return key, {}
+    return (key,), {}
+
 
 class WhenModifier(object):
     def __init__(self, mock):
         self.mock = mock
 
-    def has_a_call(self, modified_call):
-        mock_call = self.mock
-        call_structure = modified_call.parent.name.split('.')
-        for attr in call_structure:
-            mock_call = getattr(mock_call, attr)
+    def get_side_effect(self, call_structure):
+        # type: (Tuple[str, ...]) -> SideEffect
+        mock_targets = get_mock_targets(self.mock)
+        mock_call = mock_targets.get(call_structure)
+        if mock_call is None:
+            mock_call = self.mock
+            for attr in call_structure:
+                mock_call = getattr(mock_call, attr)
+            mock_targets[call_structure] = mock_call
 
         side_effect = mock_call.side_effect
         if not isinstance(mock_call.side_effect, SideEffect):
-            side_effect = SideEffect(None)
+            side_effect = SideEffect(None, mock_call)
             mock_call.side_effect = side_effect
+        if side_effect.counters is None:
+            mock_stats = vars(self.mock).get('_letz_stub_stats')
+            if mock_stats is not None:
+                side_effect.counters = mock_stats.get_counters(call_structure)
+        return side_effect
 
-        configured_calls = []
-        current_call = call(*modified_call[1], **modified_call[2])
-        side_effect.configured_calls.insert(0, (current_call, configured_calls))
-
-        return SideEffectModifier(configured_calls)
+    def has_a_call(self, modified_call):
+        side_effect = self.get_side_effect(get_call_path(modified_call.parent.name))
+
+        configured_calls = AnswerSequence()
+        match_plan = side_effect.configured_calls.add(modified_call[1], modified_call[2], configured_calls)
+        if side_effect.counters is not None:
+            side_effect.counters.add(modified_call[1], modified_call[2], configured_calls)
+        if match_plan is not None and match_plan.drops_calls:
+            side_effect.dropping_configurations.add(configured_calls)
+
+        return SideEffectModifier(configured_calls, side_effect)
+
+    def has_calls(self, method_path, answers):
+        # type: (Union[str, Tuple[str, ...]], Union[Dict[Any, Any], Iterable[Tuple[Any, Any]]]) -> None
+        """
+        Stubs many calls of the method at `method_path` at once, each returning its answer.
+
+        `answers` maps, or pairs, the stubbed arguments to the answers: a tuple of positional args, a single
+        positional arg, or a `call(...)` holding kwargs as well. The method is looked up once and the calls are added
+        to its index in a single pass.
+        """
+        if isinstance(method_path, str):
+            method_path = get_call_path(method_path)
+        else:
+            method_path = tuple(method_path)
+        if hasattr(answers, 'items'):
+            answers = answers.items()
+
+        side_effect = self.get_side_effect(method_path)
+        configurations = (get_stubbed_arguments(key) + (ReturnedValue(answer),) for key, answer in answers)
+        if side_effect.counters is not None:
+            configurations = side_effect.counters.added(configurations)
+        side_effect.configured_calls.update(configurations)
+
+    def has_rows(self, method_path, rows, answer_column=-1):
+        # type: (Union[str, Tuple[str, ...]], Iterable[Sequence[Any]], int) -> None
+        """
+        Stubs many calls from table rows, such as `DataFrame.itertuples(index=False)`: the `answer_column` of each row
+        is the answer, and the other columns are the positional args.
+        """
+        def get_answers():
+            for row in rows:
+                row = tuple(row)
+                if not row:
+                    raise ValueError('Cannot stub {!r} from an empty row'.format(method_path))
+                answer_index = answer_column % len(row)
+                yield row[:answer_index] + row[answer_index + 1:], row[answer_index]
+
+        self.has_calls(method_path, get_answers())
+
+
+def add_reset_callback(mock, callback):
+    """
+    Calls `callback` whenever the mock is reset. The callbacks and the replaced `reset_mock` are written to the mock
+    `__dict__` directly, so `spec_set` mocks accept them as well.
+    """
+    mock_attributes = vars(mock)
+    callbacks = mock_attributes.get('mock_reset_callbacks')
+    if callbacks is None:
+        callbacks = mock_attributes['mock_reset_callbacks'] = []
+        original_reset_mock = mock.reset_mock
+
+        def new_reset_mock(*args, **kwargs):
+            original_reset_mock(*args, **kwargs)
+            for reset_callback in callbacks:
+                reset_callback()
+
+        mock_attributes['reset_mock'] = new_reset_mock
+    callbacks.append(callback)
+
+
+def get_mock_targets(mock):
+    # type: (Mock) -> Dict[Tuple[str, ...], Mock]
+    """
+    Returns the cache of the mock attributes stubbed by path, which is cleared when the mock is reset.
+
+    The cache is kept in the mock `__dict__` under a private name, out of the mock namespace, and is collected with
+    the mock.
+    """
+    mock_attributes = vars(mock)
+    mock_targets = mock_attributes.get('_letz_mock_targets')
+    if mock_targets is None:
+        mock_targets = mock_attributes['_letz_mock_targets'] = {}
+        add_reset_callback(mock, mock_targets.clear)
+    return mock_targets
 
 
 def get_mock_verified_calls(mock):
-    if not isinstance(mock.mock_verified_calls, list):
-        mock.mock_verified_calls = []
-        original_reset_mock = mock.reses_mock
+    mock_attributes = vars(mock)
+    if not isinstance(mock_attributes.get('mock_verified_calls'), list):
+        mock_attributes['mock_verified_calls'] = []
+
+        def reset_verified_calls():
+            mock_attributes['mock_verified_calls'] = []
+
+        add_reset_callback(mock, reset_verified_calls)
+    return mock_attributes['mock_verified_calls']
+
+
+CALLS_SEQUENCE = count()
+
+COUNTED_CALLS = KEEP_ALL.counted()
+
+
+class RecordedCalls(CallLog, _CallList):
+    multiset_class = MockCallMultiset
+
+    def __init__(self, calls=(), sequenced=False, recording_policy=COUNTED_CALLS):
+        # type: (Iterable[tuple], bool, RecordingPolicy) -> None
+        self.sequence_numbers = None  # type: Optional[List[int]]
+        self.sequence_offset = 0
+        self.last_call = None  # type: Optional[tuple]
+        super(RecordedCalls, self).__init__(recording_policy, calls)
+
+        if sequenced:
+            self.start_sequencing()
+
+    def start_sequencing(self):
+        if self.sequence_numbers is None:
+            self.sequence_numbers = []
+            self.sequence_offset = len(self)
+            self.atomic = False
+
+    def renewed(self):
+        # type: () -> RecordedCalls
+        return RecordedCalls(sequenced=self.sequence_numbers is not None, recording_policy=self.recording_policy)
+
+    def sequenced_since(self, start):
+        # type: (int) -> List[Tuple[int, tuple]]
+        self.ensure_complete()
+        start = max(start, self.sequence_offset)
+        return list(zip(self.sequence_numbers[start - self.sequence_offset:], self[start:]))
+
+    def append(self, recorded_call):
+        self.last_call = recorded_call
+        super(RecordedCalls, self).append(recorded_call)
+
+    def retain(self, recorded_call):
+        super(RecordedCalls, self).retain(recorded_call)
+        if self.sequence_numbers is not None:
+            self.sequence_numbers.append(next(CALLS_SEQUENCE))
+
+    def drop_last_call(self, args, kwargs):
+        # type: (tuple, dict) -> None
+        last_call, self.last_call = self.last_call, None
+        if last_call is None or not has_same_args(last_call[1], last_call[2], args, kwargs):
+            return
+
+        if self and self[-1] is last_call:
+            del self[-1]
+            if self.sequence_numbers:
+                del self.sequence_numbers[-1]
+        elif self.discarded_count:
+            self.discarded_count -= 1
+        if self.multiset is not None:
+            self.multiset.discard(last_call)
+
+    def trim(self, trimmed_count):
+        super(RecordedCalls, self).trim(trimmed_count)
+        if self.sequence_numbers is not None:
+            del self.sequence_numbers[:max(0, trimmed_count - self.sequence_offset)]
+            self.sequence_offset = max(0, self.sequence_offset - trimmed_count)
+
+
+def has_same_args(recorded_args, recorded_kwargs, args, kwargs):
+    # type: (tuple, dict, tuple, dict) -> bool
+    return len(recorded_args) == len(args) and all(map(is_, recorded_args, args)) and \
+        len(recorded_kwargs) == len(kwargs) and all(name in recorded_kwargs and recorded_kwargs[name] is value
+                                                    for name, value in kwargs.items())
+
+
+def drop_recorded_call(mock, args, kwargs):
+    # type: (Mock, tuple, dict) -> None
+    """
+    Removes the call with `args` and `kwargs` the mock just recorded from its records and its parents' records. The
+    `method_calls` of the mock itself hold the calls of its children, they are left as they are.
+    """
+    call_args_list = mock.call_args_list
+    if call_args_list and has_same_args(call_args_list[-1][0], call_args_list[-1][1], args, kwargs):
+        del call_args_list[-1]
+        mock.call_args = call_args_list[-1] if call_args_list else None
+
+    called_mock = mock
+    seen = set()
+    while mock is not None and id(mock) not in seen:
+        seen.add(id(mock))
+        for recorded_calls in (mock.mock_calls,) if mock is called_mock else (mock.mock_calls, mock.method_calls):
+            if isinstance(recorded_calls, RecordedCalls):
+                recorded_calls.drop_last_call(args, kwargs)
+            elif recorded_calls and has_same_args(recorded_calls[-1][1], recorded_calls[-1][2], args, kwargs):
+                del recorded_calls[-1]
+        mock = mock._mock_new_parent
+
+
+def count_matching_calls(recorded_calls, call_to_count):
+    # type: (List[tuple], tuple) -> int
+    """
+    Counts the recorded calls matching `call_to_count` through its match plan, so its captors capture the arguments
+    of the matching calls only.
+    """
+    if isinstance(recorded_calls, RecordedCalls):
+        recorded_calls.ensure_complete()
+
+    name, args, kwargs = call_to_count
+    match_plan = compile_call(args, kwargs)
+    calls_count = 0
+    for recorded_call in recorded_calls:
+        if len(recorded_call) == 3 and recorded_call[0] in ('', name) and \
+                match_plan.matches(recorded_call[1], recorded_call[2]):
+            calls_count += 1
+    return calls_count
+
+
+def is_capturing_call(call_to_check):
+    # type: (tuple) -> bool
+    return len(call_to_check) == 3 and any(isinstance(value, Matcher) and value.is_capturing
+                                           for value in chain(call_to_check[1], call_to_check[2].values()))
+
+
+def capture_calls(recorded_calls, call_to_capture):
+    # type: (Iterable[tuple], tuple) -> None
+    """
+    Lets the captors of `call_to_capture` capture the arguments of `recorded_calls`, which were found equal to it.
+    """
+    _, args, kwargs = call_to_capture
+    match_plan = compile_call(args, kwargs)
+    for recorded_call in recorded_calls:
+        match_plan.matches(recorded_call[1], recorded_call[2])
+
+
+def get_unverified_calls(mock):
+    # type: (Mock) -> MockCallMultiset
+    recorded_calls = mock.mock_calls
+    if isinstance(recorded_calls, RecordedCalls):
+        unverified_calls = recorded_calls.get_multiset()
+    else:
+        unverified_calls = MockCallMultiset(recorded_calls)
+
+    for verified_call in get_mock_verified_calls(mock):
+        if not unverified_calls.discard(verified_call):
+            raise NoInteractionWanted('{!r} was verified but is not recorded anymore'.format(verified_call))
+    return unverified_calls
+
+
+def format_unverified_calls(unverified_calls):
+    # type: (MockCallMultiset) -> str
+    lines = ['No more interactions wanted, but found {} unverified calls:'.format(len(unverified_calls))]
+    for unverified_call, calls_count in unverified_calls.items():
+        lines.append('    {!r} x {}'.format(unverified_call, calls_count))
+    return '\n'.join(lines)
+
+
+def record_calls(mock, recording_policy=COUNTED_CALLS):
+    # type: (Mock, RecordingPolicy) -> Mock
+    mock_attributes = vars(mock)
+    if isinstance(mock_attributes.get('mock_recorded_calls'), RecordedCalls):
+        return mock
 
-        def new_reset_mock():
-            mock.mock_verified_calls = []
-            original_reset_mock()
+    mock_attributes['mock_recorded_calls'] = mock.mock_calls = RecordedCalls(mock.mock_calls,
+                                                                              recording_policy=recording_policy)
 
-        mock.reset_mock = new_reset_mock
-    return mock.mock_verified_calls
+    def reset_recorded_calls():
+        mock_attributes['mock_recorded_calls'] = mock.mock_calls = mock_attributes['mock_recorded_calls'].renewed()
+
+    add_reset_callback(mock, reset_recorded_calls)
+    return mock
 
 
 class Verifier(object):
@@ -121,7 +489,10 @@ class Verifier(object):
         self.verification = verification
 
     def had_called_with(self, call_to_verify):
-        calls_count = self.mock_instance.mock_calls.count(call_to_verify)
+        if is_capturing_call(call_to_verify):
+            calls_count = count_matching_calls(self.mock_instance.mock_calls, call_to_verify)
+        else:
+            calls_count = self.mock_instance.mock_calls.count(call_to_verify)
         self.verification(calls_count)
 
         mock_verified_call = get_mock_verified_calls(self.mock_instance)
@@ -133,33 +504,32 @@ class InOrderVerifier(object):
         # type: (InOrder, Mock, CallsCountPredicate) -> None
         self.parent_in_order = parent_in_order
         self.mock_instance = mock_instance
-        self.mock_name = parent_in_order.instances_names[mock_instance]
+        self.position = parent_in_order.positions[mock_instance]
         self.verification = verification
 
-    def found_first_invocation(self, call_to_find):
-        name, args, kwargs = call_to_find
-        manager_call_name = '{}.{}'.format(self.mock_name, name)
-        manager_call_to_find = (manager_call_name, args, kwargs)
+    def is_same_call(self, ordered_call, call_to_verify):
+        _, position, recorded_call = ordered_call
+        return position == self.position and recorded_call == call_to_verify
 
-        calls = self.parent_in_order.mock_manager.mock_calls
-        if manager_call_to_find in calls:
-            self.parent_in_order.next_index = calls.index(manager_call_to_find)
-        else:
-            self.parent_in_order.next_index = 0
+    def is_same_method(self, ordered_call, call_to_verify):
+        _, position, recorded_call = ordered_call
+        return position == self.position and recorded_call[0] == call_to_verify[0]
+
+    def found_first_invocation(self, calls, call_to_find):
+        for index, ordered_call in enumerate(calls):
+            if self.is_same_call(ordered_call, call_to_find):
+                return index
+        return 0
 
     def had_called_with(self, call_to_verify):
+        calls = self.parent_in_order.get_ordered_calls()
         if self.parent_in_order.next_index is None:
-            self.found_first_invocation(call_to_verify)
+            self.parent_in_order.next_index = self.found_first_invocation(calls, call_to_verify)
 
         calls_count = 0
 
-        name, args, kwargs = call_to_verify
-        manager_call_name = '{}.{}'.format(self.mock_name, name)
-        manager_call_to_verify = (manager_call_name, args, kwargs)
-
-        calls = self.parent_in_order.mock_manager.mock_calls
         next_index = self.parent_in_order.next_index
-        while next_index < len(calls) and calls[next_index] == manager_call_to_verify:
+        while next_index < len(calls) and self.is_same_call(calls[next_index], call_to_verify):
             next_index += 1
             calls_count += 1
 
@@ -167,7 +537,7 @@ class InOrderVerifier(object):
             self.verification(calls_count)
         except WantedButNotInvoked:
             if next_index == 0:
-                if calls_count == 0 and next_index < len(calls) and manager_call_name == calls[next_index][0]:
+                if calls_count == 0 and next_index < len(calls) and self.is_same_method(calls[0], call_to_verify):
                     raise ArgumentsAreDifferent()
                 elif calls_count == 0:
                     raise
@@ -175,8 +545,9 @@ class InOrderVerifier(object):
         except MocksException:
             raise VerificationInOrderFailure()
 
-        mock_manager_verified_call = get_mock_verified_calls(self.parent_in_order.mock_manager)
-        mock_manager_verified_call += [call_to_verify] * calls_count
+        if is_capturing_call(call_to_verify):
+            capture_calls([recorded_call for _, _, recorded_call in calls[next_index - calls_count:next_index]],
+                          call_to_verify)
         self.parent_in_order.next_index = next_index
 
         mock_verified_call = get_mock_verified_calls(self.mock_instance)
@@ -184,35 +555,42 @@ class InOrderVerifier(object):
 
 
 class InOrder(object):
+    """
+    Verifies calls against a single ordered view of all the given mocks' calls.
+
+    The mocks record their calls with a global sequence number, and the view is extended lazily by merging the calls
+    recorded since the last verification, so a chain of verifications is linear in the number of calls.
+    """
+
     def __init__(self, *mock_instances):
-        self.mock_manager = Mock()
+        self.mock_instances = mock_instances
+        self.positions = {}  # type: Dict[Mock, int]
+        self.merged_lengths = []  # type: List[int]
+        self.ordered_calls = []  # type: List[Tuple[int, int, tuple]]
 
-        self.instances_names = {}
+        for position, mock_instance in enumerate(mock_instances):
+            self.positions[mock_instance] = position
 
-        for index, mock_instance in enumerate(mock_instances):
-            mock_name = 'm_{}'.format(index)
-            self.instances_names[mock_instance] = mock_name
-            self.mock_manager.attach_mock(mock_instance, mock_name)
+            recorded_calls = record_calls(mock_instance).mock_calls
+            recorded_calls.start_sequencing()
+            self.merged_lengths.append(len(recorded_calls))
 
         self.next_index = None
 
+    def get_ordered_calls(self):
+        # type: () -> List[Tuple[int, int, tuple]]
+        new_calls = []
+        for position, mock_instance in enumerate(self.mock_instances):
+            recorded_calls = mock_instance.mock_calls
+            merged_length = self.merged_lengths[position]
+            if len(recorded_calls) > merged_length:
+                new_calls.append([(sequence_number, position, recorded_call)
+                                  for sequence_number, recorded_call in recorded_calls.sequenced_since(merged_length)])
+                self.merged_lengths[position] = len(recorded_calls)
+
+        if new_calls:
+            self.ordered_calls.extend(merge(*new_calls))
+        return self.ordered_calls
+
     def verify(self, mock_instance, verification=ONLY_ONCE_PREDICATE):
         return InOrderVerifier(self, mock_instance, verification)
-
-
-class TypePredicate(object):
-    def __init__(self, type_):
-        self.type = type_
-
-    def __eq__(self, other):
-        return isinstance(other, self.type)
-
-    def __ne__(self, other):
-        return not isinstance(other, self.type)
-
-    def __repr__(self):
-        return '<type: {}>'.format(self.type.__name__)
-
-    @classmethod
-    def create(cls, _type):
-        return TypePredicate(_type)
@@ -0,0 +1,325 @@
+import mmap
+import pickle
+import struct
+from bisect import bisect_left
+from collections import OrderedDict
+from hashlib import md5
+
+from mock import Mock
+from typing import Any, Dict, List, Optional, Tuple
+
+from letz.core import Letz, LetzController, LetzSpec
+from letz.exceptions import UnrecordedCall
+from letz.sequences import AnswerSequence
+
+MAGIC = b'LETZCAS2'
+
+HEADER = struct.Struct('<8sQQQQ')
+
+INDEX_ENTRY = struct.Struct('<16sQQ')
+
+DIGEST_SIZE = 16
+
+PICKLE_PROTOCOL = 2
+
+RETURNED = 'return'
+
+RAISED = 'raise'
+
+SCALAR_TYPES = frozenset([type(None), bool, int, type(1 << 64), float, complex, type(b''), type(u'')])
+
+SEQUENCE_TYPES = frozenset([tuple, list])
+
+SET_TYPES = frozenset([set, frozenset])
+
+
+def write_canonical_form(value, parts):
+    # type: (Any, List[str]) -> None
+    value_type = value.__class__
+    if value_type in SCALAR_TYPES:
+        parts.append('{}:{!r};'.format(value_type.__name__, value))
+    elif value_type in SEQUENCE_TYPES:
+        parts.append('{}({}:'.format(value_type.__name__, len(value)))
+        for item in value:
+            write_canonical_form(item, parts)
+        parts.append(')')
+    elif value_type in SET_TYPES:
+        parts.append('{}({}:'.format(value_type.__name__, len(value)))
+        parts.extend(sorted(get_canonical_form(item) for item in value))
+        parts.append(')')
+    elif value_type is dict:
+        parts.append('dict({}:'.format(len(value)))
+        parts.extend(sorted(get_canonical_form(key) + get_canonical_form(item) for key, item in value.items()))
+        parts.append(')')
+    else:
+        parts.append('{}.{}?;'.format(value_type.__module__, value_type.__name__))
+
+
+def get_canonical_form(value):
+    # type: (Any) -> str
+    parts = []  # type: List[str]
+    write_canonical_form(value, parts)
+    return ''.join(parts)
+
+
+def get_call_digest(path, args, kwargs):
+    # type: (Tuple[str, ...], tuple, Dict[str, Any]) -> bytes
+    """
+    Digests the canonical form of a call, which doesn't depend on how its values were built or on the order of
+    their sets and dicts. Other values only count by their type, the calls sharing a digest are told apart by
+    comparing them.
+    """
+    return md5(get_canonical_form((path, args, kwargs)).encode('utf-8')).digest()
+
+
+def is_same_call(entry, path, args, kwargs):
+    # type: (tuple, Tuple[str, ...], tuple, Dict[str, Any]) -> bool
+    return entry[0] == path and entry[1] == args and entry[2] == kwargs
+
+
+class RecordingProxy(object):
+    """
+    Stands in for the recorded object, or one of its attributes, and records its calls and their outcomes.
+
+    Attributes holding plain values are read from the real object, other attributes are wrapped as well, so the
+    calls made through them are recorded too.
+    """
+
+    __slots__ = ('recorder', 'target', 'path')
+
+    def __init__(self, recorder, target, path=()):
+        # type: (CassetteRecorder, Any, Tuple[str, ...]) -> None
+        self.recorder = recorder
+        self.target = target
+        self.path = path
+
+    def __getattr__(self, name):
+        value = getattr(self.target, name)
+        value_type = value.__class__
+        if value_type in SCALAR_TYPES or value_type in SEQUENCE_TYPES or value_type in SET_TYPES or value_type is dict:
+            return value
+        return RecordingProxy(self.recorder, value, self.path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        try:
+            result = self.target(*args, **kwargs)
+        except Exception as exception:
+            self.recorder.record(self.path, args, kwargs, (RAISED, exception))
+            raise
+        self.recorder.record(self.path, args, kwargs, (RETURNED, result))
+        return result
+
+
+class CassetteRecorder(object):
+    """
+    Records the calls made through `proxy` to a real object, and saves them into a cassette file.
+
+    Only calls are recorded, attributes holding plain values are read from the real object and are not replayed.
+    Arguments and outcomes are pickled, the calls sharing the digest of their path and arguments are saved together.
+    """
+
+    def __init__(self, target):
+        self.proxy = RecordingProxy(self, target)
+        self.entries = OrderedDict()  # type: Dict[bytes, List[Tuple[Tuple[str, ...], tuple, dict, List[tuple]]]]
+
+    def record(self, path, args, kwargs, outcome):
+        # type: (Tuple[str, ...], tuple, Dict[str, Any], tuple) -> None
+        entries = self.entries.setdefault(get_call_digest(path, args, kwargs), [])
+        for entry in entries:
+            if is_same_call(entry, path, args, kwargs):
+                entry[3].append(outcome)
+                return
+        entries.append((path, args, kwargs, [outcome]))
+
+    def save(self, file_path):
+        # type: (str) -> None
+        """
+        Writes a header, the pickled entries, the pickled recorded paths and an index of the entries sorted by digest.
+        """
+        index = []
+        with open(file_path, 'wb') as cassette_file:
+            cassette_file.write(HEADER.pack(MAGIC, 0, 0, 0, 0))
+            for digest, entries in self.entries.items():
+                data = pickle.dumps(entries, PICKLE_PROTOCOL)
+                index.append((digest, cassette_file.tell(), len(data)))
+                cassette_file.write(data)
+
+            paths_offset = cassette_file.tell()
+            paths = pickle.dumps(sorted(set(entry[0] for entries in self.entries.values() for entry in entries)),
+                                 PICKLE_PROTOCOL)
+            cassette_file.write(paths)
+
+            index_offset = cassette_file.tell()
+            for index_entry in sorted(index):
+                cassette_file.write(INDEX_ENTRY.pack(*index_entry))
+
+            cassette_file.seek(0)
+            cassette_file.write(HEADER.pack(MAGIC, len(index), index_offset, paths_offset, len(paths)))
+
+
+class DigestIndex(object):
+    """
+    Sequence of the digests of a cassette index, read from the mapped file only as a binary search visits them.
+    """
+
+    def __init__(self, data, offset, count):
+        # type: (mmap.mmap, int, int) -> None
+        self.data = data
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        start = self.offset + position * INDEX_ENTRY.size
+        return self.data[start:start + DIGEST_SIZE]
+
+    def find(self, digest):
+        # type: (bytes) -> Optional[Tuple[int, int]]
+        position = bisect_left(self, digest)
+        if position == self.count or self[position] != digest:
+            return None
+        _, offset, length = INDEX_ENTRY.unpack_from(self.data, self.offset + position * INDEX_ENTRY.size)
+        return offset, length
+
+
+class Cassette(object):
+    """
+    A saved recording, mapped in memory. Opening it only reads the header, entries are unpickled on their first call.
+    """
+
+    def __init__(self, file_path):
+        # type: (str) -> None
+        self.file = open(file_path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError('{} is not a letz cassette'.format(file_path))
+
+        if self.data[:len(MAGIC)] != MAGIC or len(self.data) < HEADER.size:
+            self.close()
+            raise ValueError('{} is not a letz cassette'.format(file_path))
+        _, count, index_offset, self.paths_offset, self.paths_length = HEADER.unpack_from(self.data)
+        self.index = DigestIndex(self.data, index_offset, count)
+        self.answers = {}  # type: Dict[bytes, List[Tuple[Tuple[str, ...], tuple, dict, AnswerSequence]]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def get_paths(self):
+        # type: () -> List[Tuple[str, ...]]
+        return pickle.loads(self.data[self.paths_offset:self.paths_offset + self.paths_length])
+
+    def get_answers(self, path, args, kwargs):
+        # type: (Tuple[str, ...], tuple, Dict[str, Any]) -> Optional[AnswerSequence]
+        digest = get_call_digest(path, args, kwargs)
+        if digest not in self.answers:
+            location = self.index.find(digest)
+            if location is None:
+                self.answers[digest] = []
+            else:
+                offset, length = location
+                self.answers[digest] = [(entry[0], entry[1], entry[2], AnswerSequence(entry[3]))
+                                        for entry in pickle.loads(self.data[offset:offset + length])]
+        for entry in self.answers[digest]:
+            if is_same_call(entry, path, args, kwargs):
+                return entry[3]
+        return None
+
+    def replay(self, path, args, kwargs):
+        # type: (Tuple[str, ...], tuple, Dict[str, Any]) -> Any
+        answers = self.get_answers(path, args, kwargs)
+        if answers is None:
+            raise UnrecordedCall('{} was not recorded with args={!r} kwargs={!r}'.format(
+                '.'.join(path) or '<root>', args, kwargs))
+
+        kind, value = answers.next_value()
+        if kind == RAISED:
+            raise value
+        return value
+
+    def get_paths_tree(self):
+        # type: () -> Dict[Tuple[str, ...], List[str]]
+        """
+        Maps the recorded paths and their prefixes to the names of their recorded attributes.
+        """
+        paths_tree = {(): []}  # type: Dict[Tuple[str, ...], List[str]]
+        for path in self.get_paths():
+            for length in range(1, len(path) + 1):
+                if path[:length] not in paths_tree:
+                    paths_tree[path[:length]] = []
+                    paths_tree[path[:length - 1]].append(path[length - 1])
+        return paths_tree
+
+    def create_letz(self, letz_controller=None):
+        # type: (Optional[LetzController]) -> Letz
+        """
+        Creates a letz which only has the recorded attributes, calls it was not recorded with raise `UnrecordedCall`.
+        Replayed calls are answered by the cassette directly, they can't be stubbed further.
+        """
+        letz_controller = letz_controller or LetzController()
+        letz = letz_controller.create_letz()
+        paths_tree = self.get_paths_tree()
+        for path in sorted(paths_tree, key=len, reverse=True):
+            path_letz = get_path(letz, path)
+            letz_controller.set_answer(path_letz, CassetteAnswer(self, path))
+            letz_controller.get_engine(path_letz).spec = RecordedPathSpec(path)
+        return letz
+
+    def create_mock(self):
+        # type: () -> Mock
+        """
+        Creates a mock which only has the recorded attributes, calls it was not recorded with raise `UnrecordedCall`.
+        """
+        return self.create_mock_path((), self.get_paths_tree())
+
+    def create_mock_path(self, path, paths_tree):
+        # type: (Tuple[str, ...], Dict[Tuple[str, ...], List[str]]) -> Mock
+        mock_instance = Mock(spec=paths_tree[path], side_effect=CassetteAnswer(self, path))
+        for name in paths_tree[path]:
+            setattr(mock_instance, name, self.create_mock_path(path + (name,), paths_tree))
+        return mock_instance
+
+
+class RecordedPathSpec(LetzSpec):
+    """
+    Spec of a replayed letz, which has no attributes but the recorded ones, created upfront.
+    """
+
+    def __init__(self, path):
+        # type: (Tuple[str, ...]) -> None
+        self.path = path
+
+    def get_member(self, name):
+        raise AttributeError('{} was not recorded'.format('.'.join(self.path + (name,))))
+
+    def is_callable(self):
+        return True
+
+
+class CassetteAnswer(object):
+    __slots__ = ('cassette', 'path')
+
+    def __init__(self, cassette, path):
+        # type: (Cassette, Tuple[str, ...]) -> None
+        self.cassette = cassette
+        self.path = path
+
+    def __call__(self, *args, **kwargs):
+        return self.cassette.replay(self.path, args, kwargs)
+
+
+def get_path(root, path):
+    # type: (Any, Tuple[str, ...]) -> Any
+    for name in path:
+        root = getattr(root, name)
+    return root
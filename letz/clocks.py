@@ -0,0 +1,60 @@
+import time
+
+
+class Clock(object):
+    def time(self):
+        # type: () -> float
+        raise NotImplementedError()
+
+    def sleep(self, seconds):
+        # type: (float) -> None
+        raise NotImplementedError()
+
+    def sleep_until(self, deadline):
+        # type: (float) -> None
+        delay = deadline - self.time()
+        if delay > 0:
+            self.sleep(delay)
+
+
+class RealClock(Clock):
+    def time(self):
+        return getattr(time, 'monotonic', time.time)()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Clock which only moves when advanced, sleeping advances it immediately.
+    """
+
+    def __init__(self, start=0.0):
+        # type: (float) -> None
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        # type: (float) -> None
+        if seconds < 0:
+            raise ValueError('Cannot move the clock backwards')
+        self.now += seconds
+
+    def advance_to(self, deadline):
+        # type: (float) -> None
+        """
+        Moves the clock to `deadline`, unless it is already past it.
+        """
+        self.now = max(self.now, deadline)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def sleep_until(self, deadline):
+        self.advance_to(deadline)
+
+
+REAL_CLOCK = RealClock()
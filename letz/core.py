@@ -1,116 +1,322 @@
 import inspect
-import keyword
+import threading
+from pickle import PicklingError
+from weakref import WeakKeyDictionary
 
-from future.utils import isidentifier
-from typing import Any, Dict, NoReturn, Type, Callable, Union
+from typing import Any, Dict, Iterable, List, NoReturn, Optional, Set, Tuple, Type, Callable, Union, TYPE_CHECKING
 
+try:
+    from inspect import signature, Parameter
+except ImportError:
+    from funcsigs import signature, Parameter
 
-class Call(tuple):
-    def __new__(cls, *args, **kwargs):
-        # type: (Type[Call], *Any, **Any) -> Call
-        return tuple.__new__(cls, (args, kwargs))
+from letz.clocks import Clock, REAL_CLOCK
+from letz.exceptions import MocksException
+from letz.indexes import CallIndex
+from letz.load import LoadModel
+from letz.recording import CallLog, CompactCallLog, CompactCallRecorder, RecordingPolicy, KEEP_ALL
+from letz.sequences import AnswerSequence
+
+if TYPE_CHECKING:
+    from mock import Mock
+    from letz.processes import RemoteTarget
+
+
+UNHASHABLE = object()
+
+ANSWER_NAME = '()'
+
+
+class Call(object):
+    """
+    The arguments of a single call, compared and hashed by value.
+
+    The hash is computed from the args and a frozen set of the kwargs items on first use and cached, so a call can be
+    used as a dict or set key. A call holding matchers or unhashable values is still comparable, but not hashable.
+    Iterating a call yields its args and its kwargs, as the `(args, kwargs)` tuple it used to be.
+    """
+
+    __slots__ = ('args', 'kwargs', 'hash_value')
 
     def __init__(self, *args, **kwargs):
-        pass
+        self.args = args
+        self.kwargs = kwargs
+        self.hash_value = None
+
+    def __hash__(self):
+        hash_value = self.hash_value
+        if hash_value is None:
+            try:
+                hash_value = hash((self.args, frozenset(self.kwargs.items())))
+            except TypeError:
+                hash_value = UNHASHABLE
+            self.hash_value = hash_value
+        if hash_value is UNHASHABLE:
+            raise TypeError('unhashable call: {!r}'.format(self))
+        return hash_value
 
     def __eq__(self, other):
-        self_args, self_kwargs = self
-        other_args, other_kwargs = other
+        if other is self:
+            return True
+        if isinstance(other, Call):
+            hash_values = self.hash_value, other.hash_value
+            if hash_values[0] != hash_values[1] and None not in hash_values and UNHASHABLE not in hash_values:
+                return False
+            other_args, other_kwargs = other.args, other.kwargs
+        else:
+            try:
+                other_args, other_kwargs = other
+            except (TypeError, ValueError):
+                return NotImplemented
 
-        return (other_args, other_kwargs) == (self_args, self_kwargs)
+        return other_args == self.args and other_kwargs == self.kwargs
 
     def __ne__(self, other):
-        return not self.__eq__(other)
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __iter__(self):
+        yield self.args
+        yield self.kwargs
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.args, self.kwargs)[index]
 
     def __call__(self, *args, **kwargs):
         return Call(*args, **kwargs)
 
     def __repr__(self):
-        return '<{} args={} kwargs={}>'.format(self.__name__, *self)
-
-    @property
-    def args(self):
-        return self[0]
-
-    @property
-    def kwargs(self):
-        return self[1]
+        return '<{} args={!r} kwargs={!r}>'.format(self.__class__.__name__, self.args, self.kwargs)
 
 
 class CallSignature(object):
-    def __init__(self, arguments_names, args=False, kwargs=False):
-        self.arguments_names = ['{}'.format(name) for name in arguments_names]
-        self.args = args
-        self.kwargs = kwargs
-
-        self.validate_arguments()
-
-    def validate_arguments(self):
-        for name in self.arguments_names:
-            if not isidentifier(name) or keyword.iskeyword(name):
-                raise ValueError('{} is not valid argument name!'.format(name))
+    """
+    Checks calls against a signature the way the interpreter would, without binding the arguments.
+    """
+
+    def __init__(self, parameters, name='letz'):
+        # type: (Iterable[Parameter], str) -> None
+        self.name = name
+        self.positional_names = []  # type: List[str]
+        self.keyword_names = set()  # type: Set[str]
+        self.required = []  # type: List[Tuple[str, Optional[int], bool]]
+        self.args = False
+        self.kwargs = False
+
+        for parameter in parameters:
+            if parameter.kind == Parameter.VAR_POSITIONAL:
+                self.args = True
+                continue
+            if parameter.kind == Parameter.VAR_KEYWORD:
+                self.kwargs = True
+                continue
+
+            position = None
+            if parameter.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD):
+                position = len(self.positional_names)
+                self.positional_names.append(parameter.name)
+            is_keyword = parameter.kind != Parameter.POSITIONAL_ONLY
+            if is_keyword:
+                self.keyword_names.add(parameter.name)
+            if parameter.default is Parameter.empty:
+                self.required.append((parameter.name, position, is_keyword))
+
+        self.positions = dict((name, position) for position, name in enumerate(self.positional_names))
 
     @classmethod
-    def from_model(cls, model):
-        arg_spec = inspect.getargspec(model)
-        return cls(arg_spec.args, arg_spec.varargs, arg_spec.keywords)
+    def from_model(cls, model, bound=False):
+        # type: (Callable, bool) -> CallSignature
+        parameters = list(signature(model).parameters.values())
+        if bound and parameters and parameters[0].kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD):
+            parameters = parameters[1:]
+        return cls(parameters, getattr(model, '__name__', 'letz'))
+
+    def check(self, *args, **kwargs):
+        positional_count = len(args)
+        if positional_count > len(self.positional_names) and not self.args:
+            raise TypeError('{}() takes {} positional arguments but {} were given'.format(
+                self.name, len(self.positional_names), positional_count))
+
+        for name in kwargs:
+            if name in self.keyword_names:
+                position = self.positions.get(name)
+                if position is not None and position < positional_count:
+                    raise TypeError('{}() got multiple values for argument {!r}'.format(self.name, name))
+            elif not self.kwargs:
+                raise TypeError('{}() got an unexpected keyword argument {!r}'.format(self.name, name))
+
+        for name, position, is_keyword in self.required:
+            if position is not None and position < positional_count:
+                continue
+            if is_keyword and name in kwargs:
+                continue
+            raise TypeError('{}() missing required argument: {!r}'.format(self.name, name))
 
 
 class CallSignatureCheckerFactory(object):
-    SIGNATURE_CHECKER_FORMAT = 'lambda {signature}: None'
+    checkers = WeakKeyDictionary()  # type: Dict[Callable, Dict[bool, Callable]]
 
     @classmethod
-    def format_signature(cls, call_signature):
-        return inspect.formatargspec(
-            call_signature.arguments_names,
-            'args' if call_signature.args else None,
-            'kwargs' if call_signature.kwargs else None,
-            []
-        ).strip('()')
+    def create(cls, signature_model, bound=False):
+        # type: (Callable, bool) -> Callable
+        if inspect.ismethod(signature_model) and signature_model.__self__ is not None:
+            signature_model, bound = signature_model.__func__, True
+
+        try:
+            model_checkers = cls.checkers.setdefault(signature_model, {})
+        except TypeError:
+            model_checkers = {}
+
+        checker = model_checkers.get(bound)
+        if checker is None:
+            checker = model_checkers[bound] = CallSignature.from_model(signature_model, bound).check
+        return checker
+
+
+class LetzSpec(object):
+    """
+    Looks up the members of a class or a module, without touching the members nobody asked for.
+    """
+
+    def __init__(self, spec):
+        if not inspect.isclass(spec) and not inspect.ismodule(spec):
+            spec = type(spec)
+        self.spec = spec
+
+    def get_member(self, name):
+        # type: (str) -> Tuple[Any, bool]
+        if inspect.ismodule(self.spec):
+            return getattr(self.spec, name), False
+
+        for klass in inspect.getmro(self.spec):
+            if name in vars(klass):
+                member = vars(klass)[name]
+                break
+        else:
+            raise AttributeError('{} has no attribute {!r}'.format(self.spec.__name__, name))
 
-    @classmethod
-    def create(cls, signature_model):
-        # type: (Callable) -> Callable
-        formatted_signature = cls.format_signature(CallSignature.from_model(signature_model))
-        formatted_checker = cls.SIGNATURE_CHECKER_FORMAT.format(signature=formatted_signature)
-        return eval(formatted_checker, {'LetzCall': Call})
+        if isinstance(member, staticmethod):
+            return member.__func__, False
+        if isinstance(member, classmethod):
+            return member.__func__, True
+        return member, True
+
+    def is_callable(self):
+        # type: () -> bool
+        return inspect.isclass(self.spec) and any('__call__' in vars(klass) for klass in inspect.getmro(self.spec))
 
 
 class LetzFactory(object):
     @classmethod
-    def create(cls, engine, is_callable=True):
-        # type: (LetzEngine, bool) -> Union[Letz, CallableLetz]
-        bases = (Letz,)
-        if is_callable:
-            bases = (CallableLetz,)
-
-        new_class = type(Letz.__name__, tuple(bases), {
-            '__slots__': (),
-            '__doc__': Letz.__doc__,
-            '__engine__': engine,
-        })  # type: Union[Letz, CallableLetz]
-        return object.__new__(new_class)
+    def create(cls, engine, is_callable=True, is_async=False):
+        # type: (LetzEngine, bool, bool) -> Union[Letz, CallableLetz]
+        letz_class = CallableLetz if is_callable else Letz
+        if is_async:
+            from letz.aio import AsyncLetz
+            letz_class = AsyncLetz
+
+        letz = object.__new__(letz_class)  # type: Union[Letz, CallableLetz]
+        object.__setattr__(letz, '__engine__', engine)
+        return letz
 
 
 class LetzController(object):
-    def __init__(self):
-        self.letzim = {}  # type: Dict[Letz, LetzEngine]
-
-    def create_letz(self, is_callable=True):
-        # type: (bool) -> Union[Letz, CallableLetz]
-        engine = LetzEngine(self)
-
-        letz = LetzFactory.create(engine, is_callable)
+    """
+    Creates letzim and keeps track of their engines.
+
+    The registry only holds weak references to the letzim, an engine is owned by its letz and a child letz (an
+    attribute or a default answer) is owned by its parent engine, so dropping a letz lets its whole subtree be
+    collected.
+    """
+
+    def __init__(self, concurrent=False, recording_policy=KEEP_ALL):
+        # type: (bool, RecordingPolicy) -> None
+        self.letzim = WeakKeyDictionary()  # type: Dict[Letz, LetzEngine]
+        self.engine_class = ConcurrentLetzEngine if concurrent else LetzEngine
+        self.recording_policy = recording_policy
+        self.call_recorder = None  # type: Optional[CompactCallRecorder]
+        self.stats_collector = None
+
+    def enable_stats(self, clock=REAL_CLOCK):
+        # type: (Clock) -> None
+        """
+        Counts the calls of every letz of the controller, the configured calls they hit or missed, and the time spent
+        answering them. Letzim of a controller without stats are not instrumented at all.
+        """
+        from letz.stats import StatsCollector
+        self.stats_collector = StatsCollector(clock)
+        for engine in list(self.letzim.values()):
+            self.stats_collector.instrument(engine)
+
+    def stats(self):
+        # type: () -> Dict[str, Any]
+        """
+        Returns a report of the counters of every letz since the stats were enabled or the controller was reset,
+        made of plain values which `json.dumps` accepts.
+        """
+        if self.stats_collector is None:
+            raise MocksException('Stats are not enabled, call enable_stats first')
+        return self.stats_collector.get_report()
+
+    def count_stubs(self, mock):
+        # type: (Mock) -> None
+        """
+        Counts the calls of the methods `mock` stubs with `when` in the stats, until the controller is reset.
+        """
+        if self.stats_collector is None:
+            raise MocksException('Stats are not enabled, call enable_stats first')
+        self.stats_collector.instrument_mock(mock)
+
+    def create_letz(self, is_callable=True, is_async=False, latency=0):
+        # type: (bool, bool, float) -> Union[Letz, CallableLetz]
+        engine = self.engine_class(self)
+        engine.is_async = is_async
+        engine.latency = latency
+        if self.stats_collector is not None:
+            self.stats_collector.instrument(engine)
+
+        letz = LetzFactory.create(engine, is_callable, is_async)
 
         self.letzim[letz] = engine
         return letz
 
+    def create_async_letz(self, latency=0):
+        # type: (float) -> CallableLetz
+        return self.create_letz(is_async=True, latency=latency)
+
     def create_singed_letz(self, signature_model):
         # type: (Callable) -> CallableLetz
         letz = self.create_letz(is_callable=True)
         letz.__engine__.set_signature(signature_model)
         return letz
 
+    def create_spec_letz(self, spec):
+        # type: (Any) -> Union[Letz, CallableLetz]
+        letz_spec = LetzSpec(spec)
+
+        letz = self.create_letz(is_callable=letz_spec.is_callable())
+        letz.__engine__.spec = letz_spec
+        if letz_spec.is_callable():
+            letz.__engine__.set_signature(*letz_spec.get_member('__call__'))
+        return letz
+
+    def create_spec_attribute_letz(self, letz_spec, name):
+        # type: (LetzSpec, str) -> Union[Letz, CallableLetz]
+        member, bound = letz_spec.get_member(name)
+
+        letz = self.create_letz()
+        if inspect.isroutine(member):
+            try:
+                letz.__engine__.set_signature(member, bound)
+            except (TypeError, ValueError):
+                pass
+        return letz
+
     def get_engine(self, letz):
         return self.letzim[letz]
 
@@ -120,10 +326,52 @@ class LetzController(object):
     def set_constant_answer(self, letz, value):
         self.letzim[letz].answer = ConstantAnswer(value)
 
+    def simulate_load(self, letz, load_model):
+        # type: (Letz, LoadModel) -> None
+        """
+        Makes the letz answer under `load_model`, including the answers configured after.
+        """
+        engine = self.letzim[letz]
+        if engine.answer is None:
+            engine.answer = ConstantAnswer(self.create_letz(), owned=True)
+        engine.answer = SimulatedAnswer(engine.answer, load_model)
+
+    def set_recording_policy(self, letz, recording_policy):
+        # type: (Letz, RecordingPolicy) -> None
+        self.letzim[letz].set_recording_policy(recording_policy)
+
+    def create_calls_log(self, recording_policy):
+        # type: (RecordingPolicy) -> Union[CallLog, CompactCallLog]
+        if not recording_policy.compact:
+            return CallLog(recording_policy)
+        if self.call_recorder is None:
+            self.call_recorder = CompactCallRecorder(Call)
+        return CompactCallLog(self.call_recorder, recording_policy)
+
+    def dispose(self, letz):
+        # type: (Letz) -> None
+        pending = [letz]
+        while pending:
+            engine = self.letzim.pop(pending.pop(), None)
+            if engine is not None:
+                pending.extend(engine.release())
+
+    def reset(self):
+        # type: () -> None
+        """
+        Releases every letz, the letzim still referenced stay registered and can still be configured.
+        """
+        for engine in list(self.letzim.values()):
+            engine.release()
+        self.call_recorder = None
+        if self.stats_collector is not None:
+            self.enable_stats(self.stats_collector.clock)
+
 
 class LetzAttribute(object):
-    def __init__(self, content):
+    def __init__(self, content, owned=False):
         self.content = content
+        self.owned = owned
 
         self.deleted = False
 
@@ -135,41 +383,68 @@ class Answer(object):
 
 class SequencedAnswer(object):
     def __init__(self, values=None):
-        self.values = values or []
-
-        self.index = 0
+        self.values = AnswerSequence(values or ())
 
     def add_value(self, value):
-        self.values.insert(0, value)
-        self.index += 1
+        self.values.append(value)
+
+    def add_values(self, values):
+        self.values.extend(values)
 
     def __call__(self, *args, **kwargs):
-        if self.index > 0:
-            self.index -= 1
-        return self.values[self.index]
+        return self.values.next_value()
 
 
 class ConstantAnswer(Answer):
-    def __init__(self, value):
+    def __init__(self, value, owned=False):
         self.value = value
+        self.owned = owned
 
     def __call__(self, *args, **kwargs):
         return self.value
 
 
+class SimulatedAnswer(Answer):
+    """
+    Answers like `answer`, taking the time and failing at the rate of a `LoadModel`.
+    """
+
+    def __init__(self, answer, load_model):
+        # type: (Callable, LoadModel) -> None
+        self.answer = answer
+        self.load_model = load_model
+
+    def __call__(self, *args, **kwargs):
+        return self.load_model.answer(self.answer, args, kwargs)
+
+
 class SignatureMatchingAnswer(object):
-    def __init__(self, default=None):
-        self.configured_calls = []
+    """
+    Answers with the latest configuration matching the call.
+
+    Exact configurations are found with a single dict lookup, configurations holding matchers are compared in
+    reverse order of configuration, and only those configured after the exact hit. So when an exact and a matcher
+    configuration both match, the one configured last wins. Calls matching no configuration are answered by the
+    `fallback` answer if any, or with `default`.
+    """
+
+    def __init__(self, default=None, fallback=None):
+        # type: (Any, Optional[Callable]) -> None
+        self.configured_calls = CallIndex()
         self.default = default
+        self.fallback = fallback
 
     def add_configuration(self, call, answer):
-        self.configured_calls.insert(0, (call, answer))
+        # type: (Call, Callable) -> None
+        self.configured_calls.add(call.args, call.kwargs, answer)
 
     def __call__(self, *args, **kwargs):
-        for configured_call, answer in self.configured_calls:
-            if Call(*args, **kwargs) == configured_call:
-                return answer(*args, **kwargs)
-        return self.default
+        answer = self.configured_calls.find(args, kwargs)
+        if answer is None:
+            if self.fallback is not None:
+                return self.fallback(*args, **kwargs)
+            return self.default
+        return answer(*args, **kwargs)
 
 
 class CallAction(object):
@@ -193,11 +468,7 @@ class AnswerConfigurationAction(CallAction):
 
     def act(self, engine, call):
         super(AnswerConfigurationAction, self).act(engine, call)
-        engine.check_call_signature(*call.args, **call.kwargs)
-        if engine.answer is None:
-            engine.answer = SignatureMatchingAnswer()
-
-        engine.answer.add_configuration(call, self.call_answer)
+        engine.add_configuration(call, self.call_answer)
         engine.reset_action()
 
 
@@ -222,7 +493,11 @@ class LetzEngine(object):
 
         self.attributes = {}
         self.answer = None
-        self.calls_log = []
+        self.calls_log = letz_controller.create_calls_log(letz_controller.recording_policy)
+        self.spec = None  # type: Optional[LetzSpec]
+        self.is_async = False
+        self.latency = 0
+        self.remote = None  # type: Optional[RemoteTarget]
 
         self._call_action = DEFAULT_ACTION
 
@@ -232,7 +507,11 @@ class LetzEngine(object):
 
     def get_attribute(self, name):
         if name not in self.attributes:
-            self.attributes[name] = LetzAttribute(self.letz_controller.create_letz())
+            if self.spec is None:
+                content = self.letz_controller.create_letz(is_async=self.is_async, latency=self.latency)
+            else:
+                content = self.letz_controller.create_spec_attribute_letz(self.spec, name)
+            self.attributes[name] = LetzAttribute(self.adopt(content, name), owned=True)
         attribute = self.attributes[name]
         if attribute.deleted:
             raise AttributeError()
@@ -243,29 +522,172 @@ class LetzEngine(object):
             self.attributes[name] = LetzAttribute(value)
         else:
             self.attributes[name].content = value
+            self.attributes[name].owned = False
 
     def get_answer(self, *args, **kwargs):
         # type: (...) -> Any
         if self.answer is None:
-            self.answer = ConstantAnswer(self.letz_controller.create_letz())
+            self.answer = ConstantAnswer(self.adopt(self.letz_controller.create_letz(), ANSWER_NAME), owned=True)
         return self.answer(*args, **kwargs)
 
+    def add_configuration(self, call, answer):
+        # type: (Call, Callable) -> None
+        simulated_answer = self.answer if isinstance(self.answer, SimulatedAnswer) else None
+        configured_answer = self.answer if simulated_answer is None else simulated_answer.answer
+        if not isinstance(configured_answer, SignatureMatchingAnswer):
+            if isinstance(configured_answer, ConstantAnswer):
+                configured_answer = SignatureMatchingAnswer(configured_answer.value)
+            else:
+                configured_answer = SignatureMatchingAnswer(fallback=configured_answer)
+            if simulated_answer is None:
+                self.answer = configured_answer
+            else:
+                simulated_answer.answer = configured_answer
+        configured_answer.add_configuration(call, answer)
+
     def log_call(self, call):
         self.calls_log.append(call)
 
+    def count_calls(self, call):
+        # type: (Call) -> int
+        return self.calls_log.count(call)
+
+    def set_recording_policy(self, recording_policy):
+        # type: (RecordingPolicy) -> None
+        self.replace_calls_log(self.letz_controller.create_calls_log(recording_policy))
+
+    def replace_calls_log(self, calls_log):
+        # type: (Union[CallLog, CompactCallLog]) -> None
+        if isinstance(self.calls_log, CompactCallLog):
+            self.calls_log.release_calls()
+        self.calls_log = calls_log
+
+    def release(self):
+        # type: () -> List[Letz]
+        """
+        Clears the letz and returns the children it created, letzim assigned to it by the user are left alone.
+        """
+        children = [attribute.content for attribute in self.attributes.values()
+                    if attribute.owned and isinstance(attribute.content, Letz)]
+        answer = unwrap_answer(self.answer)
+        if isinstance(answer, ConstantAnswer) and answer.owned and isinstance(answer.value, Letz):
+            children.append(answer.value)
+
+        self.attributes = {}
+        self.answer = None
+        self.replace_calls_log(self.calls_log.renewed())
+        self.reset_action()
+        return children
+
     def reset_action(self):
         self._call_action = DEFAULT_ACTION
 
     def handle_call(self, call):
         self._call_action.act(self, call)
 
-    def set_signature(self, signature_model):
-        self.check_call_signature = CallSignatureCheckerFactory.create(signature_model)
+    def set_signature(self, signature_model, bound=False):
+        self.check_call_signature = CallSignatureCheckerFactory.create(signature_model, bound)
+
+    def set_remote(self, remote):
+        # type: (RemoteTarget) -> None
+        """
+        Lets the letz be pickled, its copies send their calls to `remote`, and so do the copies of its children.
+        """
+        self.remote = remote
+        if remote.is_copy:
+            self.calls_log = remote.create_calls_log()
+        for name, attribute in self.attributes.items():
+            if isinstance(attribute.content, Letz):
+                self.adopt(attribute.content, name)
+        answer_letz = get_answer_letz(self.answer)
+        if answer_letz is not None:
+            self.adopt(answer_letz, ANSWER_NAME)
+
+    def adopt(self, letz, name):
+        # type: (Letz, str) -> Letz
+        if self.remote is not None and letz.__engine__.remote is None:
+            letz.__engine__.set_remote(self.remote.child(name))
+        return letz
+
+    def __getstate__(self):
+        if self.remote is None:
+            raise PicklingError('A letz can only be pickled once tracked by a CallCollector, which collects the calls '
+                                'of its copies')
+        state = dict(self.__dict__)
+        for name in ('letz_controller', 'calls_log', '_call_action', 'get_answer', 'handle_call', 'add_configuration'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.letz_controller = get_copies_controller()
+        self.remote = self.remote.copy()
+        self.calls_log = self.remote.create_calls_log()
+        self._call_action = DEFAULT_ACTION
+
+
+class ConcurrentLetzEngine(LetzEngine):
+    """
+    Engine for letzim called from several threads.
+
+    The call action is kept per thread, so a stubbing or verification in progress on one thread never takes over a
+    call made on another. Lazily created attributes and answers are created under a lock, and calls are logged with
+    `list.append`, which is atomic, unless the recording policy also trims, samples or counts them.
+    """
+
+    def __init__(self, letz_controller, call_signature_checker=None):
+        # type: (LetzController, Callable) -> NoReturn
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        super(ConcurrentLetzEngine, self).__init__(letz_controller, call_signature_checker)
+
+    @property
+    def _call_action(self):
+        return getattr(self.local, 'call_action', DEFAULT_ACTION)
+
+    @_call_action.setter
+    def _call_action(self, call_action):
+        self.local.call_action = call_action
+
+    def get_attribute(self, name):
+        if name not in self.attributes:
+            with self.lock:
+                return super(ConcurrentLetzEngine, self).get_attribute(name)
+        return super(ConcurrentLetzEngine, self).get_attribute(name)
+
+    def get_answer(self, *args, **kwargs):
+        if self.answer is None:
+            with self.lock:
+                if self.answer is None:
+                    self.answer = ConstantAnswer(self.adopt(self.letz_controller.create_letz(), ANSWER_NAME),
+                                                 owned=True)
+        return super(ConcurrentLetzEngine, self).get_answer(*args, **kwargs)
+
+    def add_configuration(self, call, answer):
+        with self.lock:
+            super(ConcurrentLetzEngine, self).add_configuration(call, answer)
+
+    def __getstate__(self):
+        state = super(ConcurrentLetzEngine, self).__getstate__()
+        del state['local'], state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        super(ConcurrentLetzEngine, self).__setstate__(state)
+
+    def log_call(self, call):
+        calls_log = self.calls_log
+        if calls_log.atomic:
+            calls_log.append(call)
+        else:
+            with self.lock:
+                calls_log.append(call)
 
 
 class Letz(object):
-    __slots__ = ()
-    __engine__ = None  # type: LetzEngine
+    __slots__ = ('__engine__', '__weakref__')
 
     def __getattr__(self, name):
         return self.__engine__.get_attribute(name)
@@ -273,9 +695,47 @@ class Letz(object):
     def __setattr__(self, name, value):
         self.__engine__.set_attribute(name, value)
 
+    def __reduce__(self):
+        return restore_letz, (self.__class__, self.__engine__)
+
 
 class CallableLetz(Letz):
+    __slots__ = ()
+
     def __call__(self, *args, **kwargs):
         call = Call(*args, **kwargs)
         self.__engine__.handle_call(call)
         return self.__engine__.get_answer(*args, **kwargs)
+
+
+def restore_letz(letz_class, engine):
+    # type: (type, LetzEngine) -> Letz
+    letz = object.__new__(letz_class)  # type: Letz
+    object.__setattr__(letz, '__engine__', engine)
+    engine.letz_controller.letzim[letz] = engine
+    return letz
+
+
+def unwrap_answer(answer):
+    return answer.answer if isinstance(answer, SimulatedAnswer) else answer
+
+
+def get_answer_letz(answer):
+    # type: (Any) -> Optional[Letz]
+    answer = unwrap_answer(answer)
+    if isinstance(answer, ConstantAnswer) and isinstance(answer.value, Letz):
+        return answer.value
+    return None
+
+
+COPIES_CONTROLLER = []  # type: List[LetzController]
+
+
+def get_copies_controller():
+    # type: () -> LetzController
+    """
+    Returns the controller of the letzim unpickled in this process.
+    """
+    if not COPIES_CONTROLLER:
+        COPIES_CONTROLLER.append(LetzController(concurrent=True))
+    return COPIES_CONTROLLER[0]
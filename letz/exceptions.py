@@ -28,3 +28,15 @@ class VerificationInOrderFailure(Exception):
 
 class ArgumentsAreDifferent(Exception):
     pass
+
+
+class CallsDiscarded(MocksException):
+    pass
+
+
+class UnrecordedCall(MocksException):
+    pass
+
+
+class SimulatedError(Exception):
+    pass
@@ -0,0 +1,230 @@
+from collections import Counter
+
+from mock.mock import _Call
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from letz.matchers import CallMatchPlan, compile_call
+
+
+NO_KWARGS = frozenset()
+
+
+def call_key(args, kwargs):
+    # type: (tuple, dict) -> Tuple[tuple, frozenset]
+    return args, frozenset(kwargs.items()) if kwargs else NO_KWARGS
+
+
+def hashable_call_key(args, kwargs):
+    # type: (tuple, dict) -> Optional[Tuple[tuple, frozenset]]
+    try:
+        key = call_key(args, kwargs)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def hashable_mock_call_key(mock_call):
+    # type: (tuple) -> Optional[Tuple[str, Tuple[tuple, frozenset]]]
+    if len(mock_call) != 3:
+        return None
+
+    name, args, kwargs = mock_call
+    key = hashable_call_key(args, kwargs)
+    if key is None:
+        return None
+    return name, key
+
+
+def hashable_record_key(record):
+    # type: (Any) -> Optional[Any]
+    if isinstance(record, tuple) and len(record) == 2:
+        return hashable_call_key(*record)
+    try:
+        hash(record)
+    except TypeError:
+        return None
+    return record
+
+
+class CallMultiset(object):
+    """
+    Counts recorded calls by key.
+
+    Recorded calls which have no hashable key are kept aside in `residual` and compared one by one.
+    """
+
+    make_key = staticmethod(hashable_record_key)
+
+    def __init__(self, calls=()):
+        # type: (Iterable[Any]) -> None
+        self.counts = Counter()  # type: Counter
+        self.calls = {}  # type: Dict[Any, Any]
+        self.residual = []  # type: List[Any]
+
+        for recorded_call in calls:
+            self.add(recorded_call)
+
+    def __len__(self):
+        return sum(self.counts.values()) + len(self.residual)
+
+    def copy(self):
+        # type: () -> CallMultiset
+        multiset = self.__class__()
+        multiset.counts.update(self.counts)
+        multiset.calls.update(self.calls)
+        multiset.residual.extend(self.residual)
+        return multiset
+
+    def candidate_keys(self, key, call_to_find):
+        # type: (Any, Any) -> List[Any]
+        return [key]
+
+    def add(self, recorded_call):
+        # type: (Any) -> None
+        key = self.make_key(recorded_call)
+        if key is None:
+            self.residual.append(recorded_call)
+            return
+
+        self.counts[key] += 1
+        if key not in self.calls:
+            self.calls[key] = recorded_call
+
+    def remove_key(self, key):
+        self.counts[key] -= 1
+        if not self.counts[key]:
+            del self.counts[key]
+            del self.calls[key]
+
+    def discard(self, call_to_discard):
+        # type: (Any) -> bool
+        """
+        Removes a single recorded call equal to `call_to_discard`, returns whether one was found.
+        """
+        key = self.make_key(call_to_discard)
+        if key is not None:
+            candidates = self.candidate_keys(key, call_to_discard)
+        else:
+            candidates = [recorded_key for recorded_key, recorded_call in self.calls.items()
+                          if recorded_call == call_to_discard]
+
+        for candidate in candidates:
+            if candidate in self.counts:
+                self.remove_key(candidate)
+                return True
+
+        for index, recorded_call in enumerate(self.residual):
+            if recorded_call == call_to_discard:
+                del self.residual[index]
+                return True
+        return False
+
+    def items(self):
+        # type: () -> Iterable[Tuple[Any, int]]
+        for key, calls_count in self.counts.items():
+            yield self.calls[key], calls_count
+        for recorded_call in self.residual:
+            yield recorded_call, 1
+
+    def count(self, call_to_count):
+        # type: (Any) -> Optional[int]
+        """
+        Returns how many recorded calls equal `call_to_count`, or None when `call_to_count` is not hashable and all
+        the recorded calls have to be scanned.
+        """
+        key = self.make_key(call_to_count)
+        if key is None:
+            return None
+
+        calls_count = 0
+        for candidate in self.candidate_keys(key, call_to_count):
+            calls_count += self.counts[candidate]
+        for recorded_call in self.residual:
+            if recorded_call == call_to_count:
+                calls_count += 1
+        return calls_count
+
+
+class MockCallMultiset(CallMultiset):
+    """
+    Counts recorded `(name, args, kwargs)` mock calls, following `mock` call equality where a recorded call without
+    a name matches a call of any name.
+
+    Like any comparison, a recorded call is compared with a call of a `_Call` subclass (a `MagicCall`) by the
+    subclass `__eq__` first, the other way around: such a call without a name matches recorded calls of any name,
+    and a named one only matches recorded calls of its name.
+    """
+
+    make_key = staticmethod(hashable_mock_call_key)
+
+    def candidate_keys(self, key, call_to_find):
+        name, call = key
+        if call_to_find.__class__ is _Call or not isinstance(call_to_find, _Call):
+            return [key, ('', call)] if name else [key]
+        if name:
+            return [key]
+        return [recorded_key for recorded_key in self.counts if recorded_key[1] == call]
+
+
+class CallIndex(object):
+    """
+    Maps configured calls to values, newest configuration first.
+
+    Calls made of hashable arguments are kept in a dict keyed by `call_key`, calls holding matchers or unhashable
+    values are compiled into a `CallMatchPlan` and kept in an ordered list. Every configuration gets a sequence
+    number, so a matcher configured after an exact hit still takes precedence over it.
+    """
+
+    def __init__(self):
+        self.exact = {}  # type: Dict[Tuple[tuple, frozenset], Tuple[int, Any]]
+        self.predicated = []  # type: List[Tuple[int, CallMatchPlan, Any]]
+        self.sequence = 0
+
+    def add(self, args, kwargs, value):
+        # type: (tuple, dict, Any) -> Optional[CallMatchPlan]
+        """
+        Configures `value` for the call, returns the match plan it was compiled into, if any.
+        """
+        self.sequence += 1
+
+        key = hashable_call_key(args, kwargs)
+        if key is not None:
+            self.exact[key] = (self.sequence, value)
+            return None
+
+        match_plan = compile_call(args, kwargs)
+        self.predicated.append((self.sequence, match_plan, value))
+        return match_plan
+
+    def update(self, configurations):
+        # type: (Iterable[Tuple[tuple, dict, Any]]) -> None
+        """
+        Configures many `(args, kwargs, value)` at once, in order.
+        """
+        exact = self.exact
+        sequence = self.sequence
+        try:
+            for args, kwargs, value in configurations:
+                sequence += 1
+                key = hashable_call_key(args, kwargs)
+                if key is not None:
+                    exact[key] = (sequence, value)
+                else:
+                    self.predicated.append((sequence, compile_call(args, kwargs), value))
+        finally:
+            self.sequence = sequence
+
+    def find(self, args, kwargs, default=None):
+        # type: (tuple, dict, Any) -> Any
+        found_sequence, found = 0, default
+        key = hashable_call_key(args, kwargs)
+        if key is not None:
+            found_sequence, found = self.exact.get(key, (0, default))
+
+        for sequence, match_plan, value in reversed(self.predicated):
+            if sequence < found_sequence:
+                break
+            if match_plan.matches(args, kwargs):
+                return value
+        return found
@@ -0,0 +1,147 @@
+import threading
+from heapq import heappop, heappush
+from random import Random
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from letz.clocks import Clock, REAL_CLOCK
+from letz.exceptions import SimulatedError
+
+
+class Latency(object):
+    def sample(self, random):
+        # type: (Random) -> float
+        raise NotImplementedError()
+
+
+class ConstantLatency(Latency):
+    def __init__(self, seconds):
+        # type: (float) -> None
+        self.seconds = seconds
+
+    def sample(self, random):
+        return self.seconds
+
+
+class UniformLatency(Latency):
+    def __init__(self, low, high):
+        # type: (float, float) -> None
+        self.low = low
+        self.high = high
+
+    def sample(self, random):
+        return random.uniform(self.low, self.high)
+
+
+class ExponentialLatency(Latency):
+    def __init__(self, mean, minimum=0.0):
+        # type: (float, float) -> None
+        self.mean = mean
+        self.minimum = minimum
+
+    def sample(self, random):
+        return self.minimum + random.expovariate(1.0 / (self.mean - self.minimum))
+
+
+class SampledLatency(Latency):
+    """
+    Latencies drawn from measured ones, so a recorded latency profile can be replayed.
+    """
+
+    def __init__(self, samples):
+        # type: (Sequence[float]) -> None
+        self.samples = list(samples)
+
+    def sample(self, random):
+        return random.choice(self.samples)
+
+
+def as_latency(latency):
+    # type: (Union[Latency, float]) -> Latency
+    if isinstance(latency, Latency):
+        return latency
+    return ConstantLatency(latency)
+
+
+class LoadModel(object):
+    """
+    How a simulated dependency behaves under load.
+
+    Each call takes a latency drawn from `latency`. At most `concurrency` calls are served at once, the others are
+    queued in arrival order, so the time a call takes is its wait for a free slot followed by its latency. A call
+    fails with `error` (an exception, an exception class or a factory) at the rate of `error_rate`, once its time is
+    over.
+
+    Calls are scheduled on `clock`: with a `VirtualClock` the whole simulation is deterministic and takes no real
+    time, and `seed` makes the drawn latencies and failures repeat between runs. Several answers sharing a model
+    share its concurrency slots, like the endpoints of a single service. Calls wait until the time their model
+    scheduled them to end rather than for a delay, so concurrent calls sleeping on a shared virtual clock overlap
+    instead of adding up.
+    """
+
+    def __init__(self, latency=0.0, concurrency=None, error_rate=0.0, error=SimulatedError, clock=REAL_CLOCK,
+                 seed=None):
+        # type: (Union[Latency, float], Optional[int], float, Any, Clock, Any) -> None
+        if concurrency is not None and concurrency < 1:
+            raise ValueError('Concurrency must be at least 1')
+        if not 0 <= error_rate <= 1:
+            raise ValueError('Error rate must be between 0 and 1')
+
+        self.latency = as_latency(latency)
+        self.concurrency = concurrency
+        self.error_rate = error_rate
+        self.error = error
+        self.clock = clock
+        self.random = Random(seed)
+        self.lock = threading.Lock()
+        self.busy_until = []  # type: List[float]
+        self.calls = 0
+        self.failures = 0
+        self.queued_time = 0.0
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        # type: () -> Tuple[float, bool]
+        """
+        Schedules a call arriving now, and returns the clock time it is over at and whether it fails.
+        """
+        with self.lock:
+            now = self.clock.time()
+            start = now
+            if self.concurrency is not None:
+                busy_until = self.busy_until
+                while busy_until and busy_until[0] <= now:
+                    heappop(busy_until)
+                if len(busy_until) >= self.concurrency:
+                    start = heappop(busy_until)
+            end = start + self.latency.sample(self.random)
+            if self.concurrency is not None:
+                heappush(self.busy_until, end)
+
+            failed = bool(self.error_rate) and self.random.random() < self.error_rate
+            self.calls += 1
+            self.failures += failed
+            self.queued_time += start - now
+            return end, failed
+
+    def complete(self, answer, failed, args, kwargs):
+        # type: (Callable, bool, tuple, Dict[str, Any]) -> Any
+        if failed:
+            if isinstance(self.error, BaseException):
+                raise self.error
+            raise self.error()
+        return answer(*args, **kwargs)
+
+    def answer(self, answer, args, kwargs):
+        # type: (Callable, tuple, Dict[str, Any]) -> Any
+        deadline, failed = self.reserve()
+        self.clock.sleep_until(deadline)
+        return self.complete(answer, failed, args, kwargs)
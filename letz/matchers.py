@@ -0,0 +1,377 @@
+import re
+from collections import deque
+
+from typing import Any, Callable, Dict, Generator, List, Optional, Pattern, Tuple, Union
+
+
+class Matcher(object):
+    """
+    Matches a single argument of a configured or verified call.
+
+    Matchers compare equal to the values they match, so they work anywhere a call is compared as a whole, and are
+    compiled into a `CallMatchPlan` when configuring answers. `cost` orders the checks of a plan, cheapest first.
+    Comparing a matcher has no side effect, values are only captured by a `CallMatchPlan` that matched.
+    """
+
+    cost = 1
+    matches_anything = False
+    is_capturing = False
+    drops_calls = False
+
+    def matches(self, value):
+        # type: (Any) -> bool
+        raise NotImplementedError()
+
+    def capture(self, value):
+        pass
+
+    def __eq__(self, other):
+        return self.matches(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+
+def as_matcher(value):
+    # type: (Any) -> Matcher
+    if isinstance(value, Matcher):
+        return value
+    return EqualMatcher(value)
+
+
+class AnyMatcher(Matcher):
+    cost = 0
+    matches_anything = True
+
+    def matches(self, value):
+        return True
+
+    def __repr__(self):
+        return '<any>'
+
+
+class EqualMatcher(Matcher):
+    def __init__(self, value):
+        self.value = value
+
+    def matches(self, value):
+        return self.value == value
+
+    def __repr__(self):
+        return '<eq: {!r}>'.format(self.value)
+
+
+class TypePredicate(Matcher):
+    def __init__(self, type_):
+        self.type = type_
+
+    def matches(self, value):
+        return isinstance(value, self.type)
+
+    def __repr__(self):
+        return '<type: {}>'.format(self.type.__name__)
+
+    @classmethod
+    def create(cls, _type):
+        return TypePredicate(_type)
+
+
+class ComparisonMatcher(Matcher):
+    symbol = None  # type: str
+
+    def __init__(self, bound):
+        self.bound = bound
+
+    def compare(self, value):
+        # type: (Any) -> bool
+        raise NotImplementedError()
+
+    def matches(self, value):
+        try:
+            return self.compare(value)
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(self.symbol, self.bound)
+
+
+class GreaterThanMatcher(ComparisonMatcher):
+    symbol = '>'
+
+    def compare(self, value):
+        return value > self.bound
+
+
+class LessThanMatcher(ComparisonMatcher):
+    symbol = '<'
+
+    def compare(self, value):
+        return value < self.bound
+
+
+class ContainsMatcher(Matcher):
+    cost = 2
+
+    def __init__(self, item):
+        self.item = item
+
+    def matches(self, value):
+        try:
+            return self.item in value
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return '<contains: {!r}>'.format(self.item)
+
+
+class RegexMatcher(Matcher):
+    cost = 3
+
+    def __init__(self, pattern, flags=0):
+        # type: (Union[str, Pattern], int) -> None
+        self.pattern = re.compile(pattern, flags) if not hasattr(pattern, 'search') else pattern
+
+    def matches(self, value):
+        try:
+            return self.pattern.search(value) is not None
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return '<regex: {!r}>'.format(self.pattern.pattern)
+
+
+class ArgThatMatcher(Matcher):
+    cost = 4
+
+    def __init__(self, predicate):
+        # type: (Callable[[Any], bool]) -> None
+        self.predicate = predicate
+
+    def matches(self, value):
+        return bool(self.predicate(value))
+
+    def __repr__(self):
+        return '<arg that: {!r}>'.format(self.predicate)
+
+
+class CompositeMatcher(Matcher):
+    name = None  # type: str
+
+    def __init__(self, matchers):
+        # type: (List[Matcher]) -> None
+        self.matchers = sorted(matchers, key=lambda matcher: matcher.cost)
+        self.cost = sum(matcher.cost for matcher in self.matchers)
+        self.is_capturing = any(matcher.is_capturing for matcher in self.matchers)
+        self.drops_calls = any(matcher.drops_calls for matcher in self.matchers)
+
+    def __repr__(self):
+        return '<{}: {}>'.format(self.name, ', '.join(repr(matcher) for matcher in self.matchers))
+
+
+class AllOfMatcher(CompositeMatcher):
+    name = 'all of'
+
+    def __init__(self, matchers):
+        # type: (List[Matcher]) -> None
+        super(AllOfMatcher, self).__init__(matchers)
+        self.matches_anything = all(matcher.matches_anything for matcher in self.matchers)
+
+    def matches(self, value):
+        for matcher in self.matchers:
+            if not matcher.matches(value):
+                return False
+        return True
+
+    def capture(self, value):
+        for matcher in self.matchers:
+            matcher.capture(value)
+
+
+class AnyOfMatcher(CompositeMatcher):
+    name = 'any of'
+
+    def __init__(self, matchers):
+        # type: (List[Matcher]) -> None
+        super(AnyOfMatcher, self).__init__(matchers)
+        self.matches_anything = any(matcher.matches_anything for matcher in self.matchers)
+
+    def matches(self, value):
+        for matcher in self.matchers:
+            if matcher.matches(value):
+                return True
+        return False
+
+    def capture(self, value):
+        for matcher in self.matchers:
+            if matcher.matches(value):
+                matcher.capture(value)
+
+
+class ArgumentCaptor(Matcher):
+    """
+    Matches any value and captures the values of the stubbed or verified calls it matched.
+
+    Captured values are kept in a buffer, holding only the last `limit` of them when given, and handed to `sink`, a
+    callable or a started generator, as they are captured. With a sink and no limit nothing is kept. A captor with
+    `drop_calls` used when stubbing also drops the calls it captured from the mock records, so large arguments are
+    not retained by the mock.
+    """
+
+    cost = 0
+    matches_anything = True
+    is_capturing = True
+
+    def __init__(self, limit=None, sink=None, drop_calls=False):
+        # type: (Optional[int], Optional[Union[Callable[[Any], Any], Generator]], bool) -> None
+        self.buffer = deque(maxlen=limit) if sink is None or limit is not None else None  # type: Optional[deque]
+        self.sink = sink
+        self.drops_calls = drop_calls
+        self.captured_count = 0
+
+        if hasattr(sink, 'send'):
+            next(sink)
+            self.sink = sink.send
+
+    @property
+    def values(self):
+        # type: () -> List[Any]
+        return list(self.buffer or ())
+
+    @property
+    def value(self):
+        # type: () -> Any
+        if not self.buffer:
+            raise ValueError('No value was captured')
+        return self.buffer[-1]
+
+    def matches(self, value):
+        return True
+
+    def capture(self, value):
+        self.captured_count += 1
+        if self.buffer is not None:
+            self.buffer.append(value)
+        if self.sink is not None:
+            self.sink(value)
+
+    def __repr__(self):
+        return '<captor>'
+
+
+ANY = AnyMatcher()
+
+
+def any_():
+    # type: () -> Matcher
+    return ANY
+
+
+def eq(value):
+    # type: (Any) -> Matcher
+    return EqualMatcher(value)
+
+
+def instance_of(type_):
+    # type: (type) -> Matcher
+    return TypePredicate(type_)
+
+
+def gt(bound):
+    # type: (Any) -> Matcher
+    return GreaterThanMatcher(bound)
+
+
+def lt(bound):
+    # type: (Any) -> Matcher
+    return LessThanMatcher(bound)
+
+
+def contains(item):
+    # type: (Any) -> Matcher
+    return ContainsMatcher(item)
+
+
+def regex(pattern, flags=0):
+    # type: (Union[str, Pattern], int) -> Matcher
+    return RegexMatcher(pattern, flags)
+
+
+def arg_that(predicate):
+    # type: (Callable[[Any], bool]) -> Matcher
+    return ArgThatMatcher(predicate)
+
+
+def all_of(*matchers):
+    # type: (*Any) -> Matcher
+    return AllOfMatcher([as_matcher(matcher) for matcher in matchers])
+
+
+def any_of(*matchers):
+    # type: (*Any) -> Matcher
+    return AnyOfMatcher([as_matcher(matcher) for matcher in matchers])
+
+
+def captor(limit=None, sink=None, drop_calls=False):
+    # type: (Optional[int], Optional[Union[Callable[[Any], Any], Generator]], bool) -> ArgumentCaptor
+    return ArgumentCaptor(limit, sink, drop_calls)
+
+
+class CallMatchPlan(object):
+    """
+    A configured call compiled for matching calls against it.
+
+    The checks run from the cheapest to the most expensive: the number of args and the kwarg names, then the exact
+    values (compared with the configured value on the left, as before), then the matchers by their cost. Matchers
+    which match anything are dropped, and captors only capture once the whole call matched.
+    """
+
+    def __init__(self, args, kwargs):
+        # type: (tuple, Dict[str, Any]) -> None
+        self.args_count = len(args)
+        self.kwarg_names = tuple(kwargs)
+        self.exact = []  # type: List[Tuple[int, Any]]
+        self.matchers = []  # type: List[Tuple[int, Matcher]]
+        self.captors = []  # type: List[Tuple[int, Matcher]]
+        self.drops_calls = False
+
+        for position, value in enumerate(args + tuple(kwargs[name] for name in self.kwarg_names)):
+            if not isinstance(value, Matcher):
+                self.exact.append((position, value))
+                continue
+            if not value.matches_anything:
+                self.matchers.append((position, value))
+            if value.is_capturing:
+                self.captors.append((position, value))
+                self.drops_calls = self.drops_calls or value.drops_calls
+        self.matchers.sort(key=lambda position_matcher: position_matcher[1].cost)
+
+    def matches(self, args, kwargs):
+        # type: (tuple, Dict[str, Any]) -> bool
+        if len(args) != self.args_count or len(kwargs) != len(self.kwarg_names):
+            return False
+        if kwargs:
+            for name in self.kwarg_names:
+                if name not in kwargs:
+                    return False
+            args += tuple(kwargs[name] for name in self.kwarg_names)
+
+        for position, value in self.exact:
+            if not value == args[position]:
+                return False
+        for position, matcher in self.matchers:
+            if not matcher.matches(args[position]):
+                return False
+
+        for position, matcher in self.captors:
+            matcher.capture(args[position])
+        return True
+
+
+def compile_call(args, kwargs):
+    # type: (tuple, Dict[str, Any]) -> CallMatchPlan
+    return CallMatchPlan(args, kwargs)
@@ -0,0 +1,279 @@
+import errno
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from weakref import ref
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from letz.core import ANSWER_NAME, Call, ConstantAnswer, Letz, LetzEngine, get_answer_letz
+from letz.exceptions import MocksException
+
+MAX_RECORD_SIZE = 1 << 20
+
+FLUSH = 'flush'
+
+STOP = 'stop'
+
+UNCOLLECTED = 'uncollected'
+
+MAX_DESCRIPTION_LENGTH = 200
+
+SENDERS = {}  # type: Dict[int, socket.socket]
+
+
+def send_record(address, record):
+    # type: (str, tuple) -> None
+    data = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+    if len(data) > MAX_RECORD_SIZE:
+        raise MocksException('A call record of {} bytes is too large to be collected'.format(len(data)))
+    process_id = os.getpid()
+    sender = SENDERS.get(process_id)
+    if sender is None:
+        SENDERS.clear()
+        sender = SENDERS[process_id] = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        sender.sendto(data, address)
+    except socket.error as error:
+        if error.errno != errno.EMSGSIZE:
+            raise
+        raise MocksException('A call record of {} bytes is too large to be collected'.format(len(data)))
+
+
+def describe_uncollected(call, error):
+    # type: (Any, Exception) -> str
+    description = repr(call)
+    if len(description) > MAX_DESCRIPTION_LENGTH:
+        description = description[:MAX_DESCRIPTION_LENGTH - 3] + '...'
+    return '{} was not collected: {!r}'.format(description, error)
+
+
+class RemoteTarget(object):
+    """
+    Where the copies of a tracked letz, or of one of its children, send their calls: the collector address, the
+    tracked letz and the path of attributes (and `()` for answers) from it.
+    """
+
+    __slots__ = ('address', 'target_id', 'path', 'is_copy')
+
+    def __init__(self, address, target_id, path=(), is_copy=False):
+        # type: (str, int, Tuple[str, ...], bool) -> None
+        self.address = address
+        self.target_id = target_id
+        self.path = path
+        self.is_copy = is_copy
+
+    def child(self, name):
+        # type: (str) -> RemoteTarget
+        return RemoteTarget(self.address, self.target_id, self.path + (name,), self.is_copy)
+
+    def copy(self):
+        # type: () -> RemoteTarget
+        return RemoteTarget(self.address, self.target_id, self.path, True)
+
+    def create_calls_log(self):
+        # type: () -> RemoteCallLog
+        return RemoteCallLog(self)
+
+    def __reduce__(self):
+        return RemoteTarget, (self.address, self.target_id, self.path, self.is_copy)
+
+
+class RemoteCallLog(object):
+    """
+    Calls log of a copied letz, which sends each call to the collector instead of keeping it.
+
+    A call costs a pickling and a single datagram, sent before the call returns, so the collector receives the calls
+    of every process in the order they were made. A call which cannot be pickled or is too large to be sent is
+    replaced by its description, the collector reports it at the next `flush`.
+    """
+
+    atomic = True
+
+    def __init__(self, target):
+        # type: (RemoteTarget) -> None
+        self.target = target
+
+    def append(self, call):
+        target = self.target
+        if call.__class__ is Call:
+            record = (os.getpid(), target.target_id, target.path, call.args, call.kwargs)
+        else:
+            record = (os.getpid(), target.target_id, target.path, call)
+        try:
+            send_record(target.address, record)
+        except socket.error:
+            raise
+        except Exception as error:
+            send_record(target.address, (UNCOLLECTED, '.'.join(('letz{}'.format(target.target_id),) + target.path),
+                                         describe_uncollected(call, error)))
+
+    def count(self, call):
+        raise MocksException('Calls of a copied letz are only counted by the letz it was copied from')
+
+    def renewed(self):
+        # type: () -> RemoteCallLog
+        return self
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+
+class CallCollector(object):
+    """
+    Collects the calls made to the copies of tracked letzim, unpickled in other processes.
+
+    Tracking a letz lets it be pickled, to a `multiprocessing` or a `concurrent.futures` worker for instance. Its
+    copies send their calls over a local datagram socket, and a thread of the collector logs them to the tracked letz
+    or the child they were made to, so its calls log holds the calls of every process. `records` holds the collected
+    calls of all the tracked letzim in the order they were received, as `(process id, name, call)`.
+
+    Forked processes get copies too, the letzim they inherit send their calls to the collector as well, on Python
+    versions which support fork handlers. Calls made by a worker are only sure to be collected once the worker
+    reported back and `flush` returned. Records which could not be sent or collected are counted in `failed_count`,
+    and `flush` raises a `MocksException` describing those that failed since the previous `flush`.
+    """
+
+    def __init__(self):
+        self.directory = tempfile.mkdtemp(prefix='letz-')
+        self.address = os.path.join(self.directory, 'calls')
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.address)
+
+        self.targets = []  # type: List[Letz]
+        self.records = []  # type: List[Tuple[int, str, Any]]
+        self.unresolved_count = 0
+        self.failed_count = 0
+        self.failures = []  # type: List[str]
+        self.flush_condition = threading.Condition()
+        self.requested_flush = 0
+        self.completed_flush = 0
+
+        self.thread = threading.Thread(target=self.receive, name='letz-call-collector')
+        self.thread.daemon = True
+        self.thread.start()
+
+        if hasattr(os, 'register_at_fork'):
+            collector_ref = ref(self)
+            os.register_at_fork(after_in_child=lambda: collector_ref() and collector_ref().copy_targets())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def track(self, letz):
+        # type: (Letz) -> Letz
+        engine = letz.__engine__
+        if engine.remote is None:
+            engine.set_remote(RemoteTarget(self.address, len(self.targets)))
+            self.targets.append(letz)
+        return letz
+
+    def iter_tracked_engines(self):
+        # type: () -> Iterator[LetzEngine]
+        pending = [letz.__engine__ for letz in self.targets]
+        while pending:
+            engine = pending.pop()
+            if engine.remote is None or engine.remote.address != self.address:
+                continue
+            yield engine
+            pending.extend(attribute.content.__engine__ for attribute in engine.attributes.values()
+                           if isinstance(attribute.content, Letz))
+            answer_letz = get_answer_letz(engine.answer)
+            if answer_letz is not None:
+                pending.append(answer_letz.__engine__)
+
+    def copy_targets(self):
+        """
+        Turns the tracked letzim of a forked process into copies, which send their calls to the collector.
+        """
+        for engine in list(self.iter_tracked_engines()):
+            if not engine.remote.is_copy:
+                engine.remote = engine.remote.copy()
+                engine.calls_log = engine.remote.create_calls_log()
+
+    def receive(self):
+        while True:
+            data = self.socket.recv(MAX_RECORD_SIZE)
+            try:
+                record = pickle.loads(data)
+                if record[0] == STOP:
+                    return
+                if record[0] == FLUSH:
+                    with self.flush_condition:
+                        self.completed_flush = record[1]
+                        self.flush_condition.notify_all()
+                elif record[0] == UNCOLLECTED:
+                    self.add_failure('{}: {}'.format(record[1], record[2]))
+                else:
+                    self.collect(*record)
+            except Exception as error:
+                self.add_failure('A call record could not be collected: {!r}'.format(error))
+
+    def add_failure(self, failure):
+        # type: (str) -> None
+        with self.flush_condition:
+            self.failed_count += 1
+            self.failures.append(failure)
+
+    def collect(self, process_id, target_id, path, *call_parts):
+        # type: (int, int, Tuple[str, ...], *Any) -> None
+        call = Call(*call_parts[0], **call_parts[1]) if len(call_parts) == 2 else call_parts[0]
+        engine = self.resolve(self.targets[target_id].__engine__, path)
+        if engine is None:
+            self.unresolved_count += 1
+            return
+        engine.log_call(call)
+        self.records.append((process_id, '.'.join(('letz{}'.format(target_id),) + path), call))
+
+    def resolve(self, engine, path):
+        # type: (LetzEngine, Tuple[str, ...]) -> Optional[LetzEngine]
+        for name in path:
+            if name != ANSWER_NAME:
+                engine = engine.get_attribute(name).__engine__
+                continue
+            if engine.answer is None:
+                engine.answer = ConstantAnswer(engine.adopt(engine.letz_controller.create_letz(), ANSWER_NAME),
+                                               owned=True)
+            answer_letz = get_answer_letz(engine.answer)
+            if answer_letz is None:
+                return None
+            engine = answer_letz.__engine__
+        return engine
+
+    def flush(self, timeout=10):
+        # type: (float) -> None
+        with self.flush_condition:
+            self.requested_flush += 1
+            requested_flush = self.requested_flush
+        send_record(self.address, (FLUSH, requested_flush))
+
+        deadline = time.time() + timeout
+        with self.flush_condition:
+            while self.completed_flush < requested_flush:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise MocksException('The calls were not collected within {} seconds'.format(timeout))
+                self.flush_condition.wait(remaining)
+            failures, self.failures = self.failures, []
+        if failures:
+            raise MocksException('{} calls were not collected:\n    {}'.format(len(failures), '\n    '.join(failures)))
+
+    def close(self):
+        for engine in list(self.iter_tracked_engines()):
+            engine.remote = None
+        self.targets = []
+        if self.thread.is_alive():
+            send_record(self.address, (STOP,))
+            self.thread.join()
+        self.socket.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,191 @@
+import gc
+import warnings
+from types import FunctionType, ModuleType
+
+import pytest
+from mock import Mock
+from typing import Dict, Iterator, List, Optional
+
+from letz.aliases import recorded, when as when_modifier, verify as verifier
+from letz.arrangements import ONLY_ONCE_PREDICATE, CallsCountPredicate, Verifier, WhenModifier, \
+    get_unverified_calls, format_unverified_calls
+from letz.core import Letz, LetzController, ConcurrentLetzEngine
+from letz.exceptions import MocksException
+from letz.recording import KEEP_ALL, RecordingPolicy
+
+REPORT_MODES = ('warn', 'fail', 'ignore')
+
+
+class LetzInteractionsWarning(UserWarning):
+    pass
+
+
+UNWALKED_TYPES = (type, ModuleType, FunctionType, LetzController)
+
+
+def get_held_letzim(owner):
+    # type: (object) -> List[Letz]
+    """
+    Returns the letzim reachable from `owner`, without walking through classes, modules, functions or controllers.
+    """
+    if owner is None:
+        return []
+
+    held_letzim = []
+    seen = {id(owner)}
+    pending = [owner]
+    while pending:
+        for referent in gc.get_referents(pending.pop()):
+            referent_class = type(referent)
+            if id(referent) in seen or issubclass(referent_class, UNWALKED_TYPES):
+                continue
+            seen.add(id(referent))
+            if issubclass(referent_class, Letz):
+                held_letzim.append(referent)
+            pending.append(referent)
+    return held_letzim
+
+
+class LetzControllerPool(object):
+    """
+    Keeps reset controllers around for the following tests.
+
+    Releasing a controller resets it, which only walks the letzim still alive, so the cost of a test's teardown
+    follows what the test left behind rather than everything it created. A controller whose letzim are still
+    referenced after the reset is not reused, so they don't count as leaks of the following tests. The letzim held
+    by the `owner` of the controller, the instance of a class-based test, are forgotten by the controller instead.
+    """
+
+    def __init__(self, size=8):
+        # type: (int) -> None
+        self.size = size
+        self.free = {False: [], True: []}  # type: Dict[bool, List[LetzController]]
+
+    def acquire(self, concurrent=False, recording_policy=KEEP_ALL):
+        # type: (bool, RecordingPolicy) -> LetzController
+        free = self.free[concurrent]
+        letz_controller = free.pop() if free else LetzController(concurrent)
+        letz_controller.recording_policy = recording_policy
+        return letz_controller
+
+    def release(self, letz_controller, owner=None):
+        # type: (LetzController, object) -> None
+        letz_controller.stats_collector = None
+        letz_controller.reset()
+        letz_controller.recording_policy = KEEP_ALL
+        for held_letz in get_held_letzim(owner):
+            letz_controller.letzim.pop(held_letz, None)
+        free = self.free[issubclass(letz_controller.engine_class, ConcurrentLetzEngine)]
+        if len(free) < self.size and not letz_controller.letzim:
+            free.append(letz_controller)
+
+
+class LetzSession(object):
+    """
+    What a single test creates through the `letz` fixture: letzim from a pooled controller and the mocks it stubs,
+    verifies or creates, which are checked for unverified calls at teardown.
+    """
+
+    def __init__(self, letz_controller):
+        # type: (LetzController) -> None
+        self.controller = letz_controller
+        self.mocks = []  # type: List[Mock]
+        self.verified_mocks = []  # type: List[Mock]
+
+    def create(self, is_callable=True):
+        # type: (bool) -> Letz
+        return self.controller.create_letz(is_callable)
+
+    def spec(self, spec):
+        # type: (object) -> Letz
+        return self.controller.create_spec_letz(spec)
+
+    def mock(self, *args, **kwargs):
+        # type: (*object, **object) -> Mock
+        mock_instance = recorded(Mock(*args, **kwargs))
+        self.mocks.append(mock_instance)
+        return mock_instance
+
+    def when(self, mock_instance):
+        # type: (Mock) -> WhenModifier
+        return when_modifier(mock_instance)
+
+    def verify(self, mock_instance, calls_count_verifier=ONLY_ONCE_PREDICATE):
+        # type: (Mock, CallsCountPredicate) -> Verifier
+        if not any(verified_mock is mock_instance for verified_mock in self.verified_mocks):
+            self.verified_mocks.append(mock_instance)
+        return verifier(mock_instance, calls_count_verifier)
+
+    def checked_mocks(self):
+        # type: () -> Iterator[Mock]
+        seen = set()
+        for mock_instance in self.mocks + self.verified_mocks:
+            if id(mock_instance) not in seen:
+                seen.add(id(mock_instance))
+                yield mock_instance
+
+    def get_report(self, check_leaks=True):
+        # type: (bool) -> Optional[str]
+        lines = []
+        for mock_instance in self.checked_mocks():
+            try:
+                unverified_calls = get_unverified_calls(mock_instance)
+            except MocksException as exception:
+                lines.append('{!r}: {}'.format(mock_instance, exception))
+                continue
+            if unverified_calls:
+                lines.append('{!r}: {}'.format(mock_instance, format_unverified_calls(unverified_calls)))
+
+        leaked_count = len(self.controller.letzim) if check_leaks else 0
+        if leaked_count:
+            lines.append('{} letzim are still referenced after the test'.format(leaked_count))
+        return '\n'.join(lines) or None
+
+
+CONTROLLER_POOL = LetzControllerPool()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('letz')
+    group.addoption('--letz-report', choices=REPORT_MODES, default='warn',
+                    help='How to report unverified calls and leaked letzim at teardown: warn, fail or ignore')
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == 'call':
+        item.letz_call_failed = report.failed
+
+
+def get_report_mode(config):
+    return getattr(config.option, 'letz_report', None) or 'warn'
+
+
+@pytest.fixture
+def letz(request):
+    letz_controller = CONTROLLER_POOL.acquire()
+    session = LetzSession(letz_controller)
+    try:
+        yield session
+    finally:
+        CONTROLLER_POOL.release(letz_controller, request.instance)
+
+    report_mode = get_report_mode(request.config)
+    if report_mode != 'ignore' and not getattr(request.node, 'letz_call_failed', False):
+        report = session.get_report()
+        if report is not None:
+            if report_mode == 'fail':
+                pytest.fail(report, pytrace=False)
+            warnings.warn(LetzInteractionsWarning(report))
+
+
+@pytest.fixture
+def when(letz):
+    return letz.when
+
+
+@pytest.fixture
+def verify(letz):
+    return letz.verify
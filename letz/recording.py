@@ -0,0 +1,455 @@
+import threading
+from array import array
+from collections import Counter
+from itertools import count
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type
+
+from letz.clocks import Clock, REAL_CLOCK
+from letz.exceptions import CallsDiscarded
+from letz.indexes import CallMultiset, hashable_record_key
+
+
+class RecordingPolicy(object):
+    """
+    Decides what a call log keeps: every call, only the last `limit` calls, one call out of `sample_every`, or no
+    calls at all. With `keep_counts` the log also counts every call by key, so counts stay exact whatever was
+    discarded, and with `compact` the kept calls are stored in a `CompactCallLog`.
+    """
+
+    def __init__(self, keep_calls=True, limit=None, sample_every=1, keep_counts=False, compact=False):
+        # type: (bool, Optional[int], int, bool, bool) -> None
+        self.keep_calls = keep_calls
+        self.limit = limit
+        self.sample_every = sample_every
+        self.keep_counts = keep_counts
+        self.compact = compact
+
+    @property
+    def is_lossless(self):
+        # type: () -> bool
+        return self.keep_calls and self.limit is None and self.sample_every == 1
+
+    def counted(self):
+        # type: () -> RecordingPolicy
+        return RecordingPolicy(self.keep_calls, self.limit, self.sample_every, True, self.compact)
+
+    def compacted(self):
+        # type: () -> RecordingPolicy
+        return RecordingPolicy(self.keep_calls, self.limit, self.sample_every, self.keep_counts, True)
+
+
+KEEP_ALL = RecordingPolicy()
+
+
+def keep_last(limit):
+    # type: (int) -> RecordingPolicy
+    return RecordingPolicy(limit=limit)
+
+
+def keep_counts():
+    # type: () -> RecordingPolicy
+    return RecordingPolicy(keep_calls=False, keep_counts=True)
+
+
+def keep_sample(every):
+    # type: (int) -> RecordingPolicy
+    return RecordingPolicy(sample_every=every)
+
+
+def keep_compact():
+    # type: () -> RecordingPolicy
+    return RecordingPolicy(compact=True)
+
+
+class RecordingLog(object):
+    """
+    Applies a `RecordingPolicy` on top of the storage of a log, which has to implement `retain`, `trim`, `__len__`,
+    `__iter__` and `count_retained`.
+
+    With a limit, the oldest calls are trimmed in bulk once the log doubles the limit, so the log holds between
+    `limit` and `2 * limit` calls and appending stays O(1) amortized. Counting calls that were discarded raises
+    `CallsDiscarded`, unless the policy keeps counts.
+    """
+
+    multiset_class = CallMultiset  # type: Type[CallMultiset]
+
+    def __init__(self, recording_policy=KEEP_ALL, calls=()):
+        # type: (RecordingPolicy, Iterable[Any]) -> None
+        super(RecordingLog, self).__init__()
+        self.recording_policy = recording_policy
+        self.recorded_count = 0
+        self.discarded_count = 0
+        self.multiset = self.multiset_class() if recording_policy.keep_counts else None  # type: Optional[CallMultiset]
+        self.atomic = False
+
+        for recorded_call in calls:
+            self.record(recorded_call)
+
+    def renewed(self):
+        # type: () -> RecordingLog
+        return self.__class__(self.recording_policy)
+
+    def record(self, recorded_call):
+        self.recorded_count += 1
+        if self.multiset is not None:
+            self.multiset.add(recorded_call)
+
+        recording_policy = self.recording_policy
+        if not recording_policy.keep_calls or (self.recorded_count - 1) % recording_policy.sample_every:
+            self.discarded_count += 1
+            return
+
+        self.retain(recorded_call)
+        if recording_policy.limit is not None and len(self) >= 2 * recording_policy.limit:
+            self.trim(len(self) - recording_policy.limit)
+
+    append = record
+
+    def extend(self, recorded_calls):
+        for recorded_call in recorded_calls:
+            self.append(recorded_call)
+
+    def retain(self, recorded_call):
+        raise NotImplementedError()
+
+    def trim(self, trimmed_count):
+        # type: (int) -> None
+        self.discarded_count += trimmed_count
+
+    def count_retained(self, call_to_count):
+        # type: (Any) -> int
+        raise NotImplementedError()
+
+    def ensure_complete(self):
+        if self.discarded_count:
+            raise CallsDiscarded('{} of the recorded calls were discarded by the recording policy'.format(
+                self.discarded_count))
+
+    def count(self, call_to_count):
+        if self.multiset is not None:
+            calls_count = self.multiset.count(call_to_count)
+            if calls_count is not None:
+                return calls_count
+        self.ensure_complete()
+        return self.count_retained(call_to_count)
+
+    def get_multiset(self):
+        # type: () -> CallMultiset
+        if self.multiset is not None:
+            return self.multiset.copy()
+        self.ensure_complete()
+        return self.multiset_class(self)
+
+
+class CallLog(RecordingLog, list):
+    """
+    List of recorded calls that follows a `RecordingPolicy`.
+    """
+
+    def __init__(self, recording_policy=KEEP_ALL, calls=()):
+        # type: (RecordingPolicy, Iterable[Any]) -> None
+        super(CallLog, self).__init__(recording_policy, calls)
+        self.atomic = self.multiset is None and recording_policy.is_lossless
+
+    def append(self, recorded_call):
+        if self.atomic:
+            list.append(self, recorded_call)
+        else:
+            self.record(recorded_call)
+
+    def retain(self, recorded_call):
+        list.append(self, recorded_call)
+
+    def trim(self, trimmed_count):
+        # type: (int) -> None
+        del self[:trimmed_count]
+        super(CallLog, self).trim(trimmed_count)
+
+    def count_retained(self, call_to_count):
+        # type: (Any) -> int
+        return list.count(self, call_to_count)
+
+
+class CompactCall(tuple):
+    """
+    A call of the interner `call_class`, stored as `(args, kwarg names, kwarg values)`.
+    """
+
+    __slots__ = ()
+
+
+INTERNED_TYPES = frozenset([bool, int, type(1 << 64), type(b''), type(u'')])
+
+
+class CallInterner(object):
+    """
+    Stores every distinct recorded call once and gives it an id, kept as long as a log retains the call.
+
+    Calls of `call_class` are kept as `(args, kwarg names, kwarg values)`, with their values of `INTERNED_TYPES` and
+    kwarg names interned, and are materialized back into a `call_class` only when asked for. Values of other types,
+    floats for instance, may be equal without being the same (`0.0 == -0.0`), so they are not interned and the calls
+    holding them get a new id every time, as the calls that cannot be hashed. Equal calls of interned values of the
+    same types share an id and materialize as the first of them recorded.
+
+    Ids and values are reference counted: `release` frees the id of a call no log retains anymore, and the values no
+    retained call holds, and freed ids are reused.
+    """
+
+    def __init__(self, call_class):
+        # type: (type) -> None
+        self.call_class = call_class
+        self.ids = {}  # type: Dict[Any, Dict[tuple, int]]
+        self.unshared_ids = {}  # type: Dict[Any, Set[int]]
+        self.calls = []  # type: List[Any]
+        self.keys = []  # type: List[Tuple[Any, Optional[tuple]]]
+        self.references = []  # type: List[int]
+        self.free_ids = []  # type: List[int]
+        self.residual_ids = set()  # type: Set[int]
+        self.values = {}  # type: Dict[Tuple[type, Any], List[Any]]
+        self.names = {}  # type: Dict[tuple, tuple]
+
+    def __len__(self):
+        return len(self.calls) - len(self.free_ids)
+
+    def intern_value(self, value):
+        if value.__class__ not in INTERNED_TYPES:
+            return value
+        interned = self.values.get((value.__class__, value))
+        if interned is None:
+            interned = self.values[value.__class__, value] = [value, 0]
+        interned[1] += 1
+        return interned[0]
+
+    def release_value(self, value):
+        if value.__class__ not in INTERNED_TYPES:
+            return
+        interned = self.values[value.__class__, value]
+        interned[1] -= 1
+        if not interned[1]:
+            del self.values[value.__class__, value]
+
+    def compact(self, recorded_call):
+        if recorded_call.__class__ is not self.call_class:
+            return recorded_call
+
+        args, kwargs = recorded_call
+        names = tuple(sorted(kwargs))
+        names = self.names.setdefault(names, names)
+        return CompactCall((tuple(self.intern_value(value) for value in args), names,
+                            tuple(self.intern_value(kwargs[name]) for name in names)))
+
+    def get_shared_types(self, recorded_call):
+        # type: (Any) -> Optional[tuple]
+        """
+        Returns the types of the values of a call which can share its id with the equal calls of the same types.
+        """
+        if recorded_call.__class__ is not self.call_class:
+            return None
+        args, kwargs = recorded_call
+        value_types = tuple(value.__class__ for value in args + tuple(kwargs[name] for name in sorted(kwargs)))
+        if not INTERNED_TYPES.issuperset(value_types):
+            return None
+        return value_types
+
+    def intern(self, recorded_call):
+        # type: (Any) -> int
+        key = hashable_record_key(recorded_call)
+        shared_types = None if key is None else self.get_shared_types(recorded_call)
+        if shared_types is not None:
+            call_id = self.ids.get(key, {}).get(shared_types)
+            if call_id is not None:
+                self.references[call_id] += 1
+                return call_id
+
+        compact_call = self.compact(recorded_call)
+        if self.free_ids:
+            call_id = self.free_ids.pop()
+            self.calls[call_id] = compact_call
+            self.keys[call_id] = (key, shared_types)
+            self.references[call_id] = 1
+        else:
+            call_id = len(self.calls)
+            self.calls.append(compact_call)
+            self.keys.append((key, shared_types))
+            self.references.append(1)
+
+        if key is None:
+            self.residual_ids.add(call_id)
+        elif shared_types is not None:
+            self.ids.setdefault(key, {})[shared_types] = call_id
+        else:
+            self.unshared_ids.setdefault(key, set()).add(call_id)
+        return call_id
+
+    def release(self, call_id):
+        # type: (int) -> None
+        self.references[call_id] -= 1
+        if self.references[call_id]:
+            return
+
+        key, shared_types = self.keys[call_id]
+        if key is None:
+            self.residual_ids.discard(call_id)
+        elif shared_types is not None:
+            shared_ids = self.ids[key]
+            del shared_ids[shared_types]
+            if not shared_ids:
+                del self.ids[key]
+        else:
+            unshared_ids = self.unshared_ids[key]
+            unshared_ids.discard(call_id)
+            if not unshared_ids:
+                del self.unshared_ids[key]
+
+        compact_call = self.calls[call_id]
+        if isinstance(compact_call, CompactCall):
+            args, _, values = compact_call
+            for value in args + values:
+                self.release_value(value)
+        self.calls[call_id] = None
+        self.keys[call_id] = (None, None)
+        self.free_ids.append(call_id)
+
+    def find_ids(self, key):
+        # type: (Any) -> List[int]
+        """
+        Returns the ids of the hashable calls equal to the call of `key`.
+        """
+        call_ids = list(self.unshared_ids.get(key, ()))
+        if key in self.ids:
+            call_ids.extend(self.ids[key].values())
+        return call_ids
+
+    def materialize(self, call_id):
+        # type: (int) -> Any
+        compact_call = self.calls[call_id]
+        if not isinstance(compact_call, CompactCall):
+            return compact_call
+        args, names, values = compact_call
+        return self.call_class(*args, **dict(zip(names, values)))
+
+
+class CompactCallRecorder(object):
+    """
+    Shared by the compact logs of a controller: interns their calls, numbers them in a single sequence and
+    timestamps them.
+
+    The logs of several letzim may be written from several threads, so the interner is only used under `lock`.
+    """
+
+    def __init__(self, call_class, clock=REAL_CLOCK):
+        # type: (type, Clock) -> None
+        self.interner = CallInterner(call_class)
+        self.sequence = count()
+        self.clock = clock
+        self.lock = threading.Lock()
+
+    def intern(self, recorded_call):
+        # type: (Any) -> int
+        with self.lock:
+            return self.interner.intern(recorded_call)
+
+    def release(self, call_ids):
+        # type: (Iterable[int]) -> None
+        with self.lock:
+            for call_id in call_ids:
+                self.interner.release(call_id)
+
+    def materialize(self, call_id):
+        # type: (int) -> Any
+        with self.lock:
+            return self.interner.materialize(call_id)
+
+
+class CompactCallLog(RecordingLog):
+    """
+    Call log stored in `array` columns: a sequence number, an interned call id and a timestamp per call, taking 24
+    bytes per call on 64 bit platforms instead of a `Call` with its own args tuple and kwargs dict.
+
+    Calls are materialized only when read. Counting a hashable call doesn't materialize anything, it counts its id.
+    """
+
+    def __init__(self, recorder, recording_policy=KEEP_ALL, calls=()):
+        # type: (CompactCallRecorder, RecordingPolicy, Iterable[Any]) -> None
+        self.recorder = recorder
+        self.sequence_numbers = array('l')
+        self.call_ids = array('l')
+        self.timestamps = array('d')
+        super(CompactCallLog, self).__init__(recording_policy, calls)
+
+    def renewed(self):
+        # type: () -> CompactCallLog
+        return CompactCallLog(self.recorder, self.recording_policy)
+
+    def retain(self, recorded_call):
+        recorder = self.recorder
+        self.sequence_numbers.append(next(recorder.sequence))
+        self.call_ids.append(recorder.intern(recorded_call))
+        self.timestamps.append(recorder.clock.time())
+
+    def trim(self, trimmed_count):
+        # type: (int) -> None
+        self.recorder.release(self.call_ids[:trimmed_count])
+        del self.sequence_numbers[:trimmed_count]
+        del self.call_ids[:trimmed_count]
+        del self.timestamps[:trimmed_count]
+        super(CompactCallLog, self).trim(trimmed_count)
+
+    def release_calls(self):
+        """
+        Releases the retained calls from the interner, when the log is replaced by another one.
+        """
+        self.recorder.release(self.call_ids)
+        self.sequence_numbers = array('l')
+        self.call_ids = array('l')
+        self.timestamps = array('d')
+
+    def count_retained(self, call_to_count):
+        # type: (Any) -> int
+        recorder = self.recorder
+        key = hashable_record_key(call_to_count)
+        with recorder.lock:
+            call_ids = None if key is None or recorder.interner.residual_ids else recorder.interner.find_ids(key)
+        if call_ids is not None:
+            if len(call_ids) < 2:
+                return self.call_ids.count(call_ids[0]) if call_ids else 0
+            calls_counts = Counter(self.call_ids)
+            return sum(calls_counts[call_id] for call_id in call_ids)
+
+        return sum(calls_count for call_id, calls_count in Counter(self.call_ids).items()
+                   if recorder.materialize(call_id) == call_to_count)
+
+    def records(self):
+        # type: () -> Iterator[Tuple[int, float, Any]]
+        """
+        Yields the retained calls as `(sequence number, timestamp, call)`.
+        """
+        materialize = self.recorder.materialize
+        for sequence_number, call_id, timestamp in zip(self.sequence_numbers, self.call_ids, self.timestamps):
+            yield sequence_number, timestamp, materialize(call_id)
+
+    def __len__(self):
+        return len(self.call_ids)
+
+    def __iter__(self):
+        materialize = self.recorder.materialize
+        for call_id in self.call_ids:
+            yield materialize(call_id)
+
+    def __getitem__(self, index):
+        materialize = self.recorder.materialize
+        if isinstance(index, slice):
+            return [materialize(call_id) for call_id in self.call_ids[index]]
+        return materialize(self.call_ids[index])
+
+    def __eq__(self, other):
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
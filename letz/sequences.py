@@ -0,0 +1,52 @@
+from collections import deque
+
+from typing import Any, Iterable
+
+NO_VALUE = object()
+
+
+class LazyValues(object):
+    __slots__ = ('iterator',)
+
+    def __init__(self, values):
+        # type: (Iterable) -> None
+        self.iterator = iter(values)
+
+
+class AnswerSequence(object):
+    """
+    FIFO of values which keeps repeating the last value once it is consumed.
+
+    Appending and consuming are O(1). Iterables added with `extend` are consumed lazily, one value per call, so
+    generators of any length are never materialized.
+    """
+
+    def __init__(self, values=()):
+        # type: (Iterable) -> None
+        self.pending = deque(values)
+        self.last = NO_VALUE
+
+    def append(self, value):
+        # type: (Any) -> None
+        self.pending.append(value)
+
+    def extend(self, values):
+        # type: (Iterable) -> None
+        self.pending.append(LazyValues(values))
+
+    def next_value(self):
+        # type: () -> Any
+        pending = self.pending
+        while pending:
+            value = pending[0]
+            if value.__class__ is not LazyValues:
+                self.last = pending.popleft()
+                return self.last
+
+            for self.last in value.iterator:
+                return self.last
+            pending.popleft()
+
+        if self.last is NO_VALUE:
+            raise IndexError('No values in sequence')
+        return self.last
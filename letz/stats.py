@@ -0,0 +1,250 @@
+from itertools import count
+from weakref import ref
+
+from mock import Mock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from letz.arrangements import SideEffect, StubCounters, get_mock_targets
+from letz.clocks import Clock, REAL_CLOCK
+from letz.core import ANSWER_NAME, DEFAULT_ACTION, Call, Letz, LetzEngine, SignatureMatchingAnswer, get_answer_letz, \
+    unwrap_answer
+
+
+def format_call(name, call):
+    # type: (str, Call) -> str
+    arguments = [repr(arg) for arg in call.args]
+    arguments.extend('{}={!r}'.format(key, value) for key, value in sorted(call.kwargs.items()))
+    return '{}({})'.format(name, ', '.join(arguments))
+
+
+class EngineStats(object):
+    """
+    Counters of a single letz: its calls, those answered by a configured call (hits), those which fell through to
+    the default answer of its configured calls (misses), and the time spent answering them.
+    """
+
+    def __init__(self, number):
+        # type: (int) -> None
+        self.number = number
+        self.name = 'letz{}'.format(number)
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.latency = 0.0
+        self.stubs = []  # type: List[StubStats]
+        self.counting = True
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'hits': self.hits,
+            'misses': self.misses,
+            'latency': self.latency,
+            'stubs': [stub.as_dict(self.name) for stub in sorted(self.stubs, key=lambda stub: -stub.hits)],
+        }
+
+
+class StubStats(object):
+    """
+    Stands in for a configured answer and counts the calls it answered.
+    """
+
+    __slots__ = ('engine_stats', 'call', 'answer', 'hits')
+
+    def __init__(self, engine_stats, call, answer):
+        # type: (EngineStats, Call, Callable) -> None
+        self.engine_stats = engine_stats
+        self.call = call
+        self.answer = answer
+        self.hits = 0
+
+    def __call__(self, *args, **kwargs):
+        if self.engine_stats.counting:
+            self.hits += 1
+            self.engine_stats.hits += 1
+        return self.answer(*args, **kwargs)
+
+    def as_dict(self, name):
+        # type: (str) -> Dict[str, Any]
+        return {'call': format_call(name, self.call), 'hits': self.hits}
+
+
+class MockStats(object):
+    """
+    Counters of the calls of the methods a mock stubs with `when`, one `StubCounters` per stubbed path.
+    """
+
+    def __init__(self, number):
+        # type: (int) -> None
+        self.number = number
+        self.name = 'mock{}'.format(number)
+        self.counters = {}  # type: Dict[Tuple[str, ...], StubCounters]
+
+    def get_counters(self, path):
+        # type: (Tuple[str, ...]) -> StubCounters
+        counters = self.counters.get(path)
+        if counters is None:
+            counters = self.counters[path] = StubCounters()
+        return counters
+
+    def as_dicts(self):
+        # type: () -> Iterator[Dict[str, Any]]
+        for path, counters in sorted(self.counters.items()):
+            name = self.name + ''.join('.' + part for part in path if part)
+            stubs = [{'call': format_call(name, Call(*args, **kwargs)), 'hits': counters.hits[configuration]}
+                     for args, kwargs, configuration in counters.stubs]
+            yield {
+                'name': name,
+                'calls': counters.calls,
+                'hits': counters.calls - counters.misses,
+                'misses': counters.misses,
+                'stubs': sorted(stubs, key=lambda stub: -stub['hits']),
+            }
+
+
+class StatsCollector(object):
+    """
+    Instruments the engines of a controller by replacing their `get_answer` and `add_configuration` on the instance,
+    so engines of a controller without stats run exactly as before, and the mocks it is asked to count the stubs of.
+
+    Engines and mocks are held weakly: once one is collected its counters only add up to the totals of the report.
+    Counters are not synchronized, they may miss a few calls made from several threads at once.
+    """
+
+    def __init__(self, clock=REAL_CLOCK):
+        # type: (Clock) -> None
+        self.clock = clock
+        self.sequence = count()
+        self.mock_sequence = count()
+        self.engines = {}  # type: Dict[int, Tuple[Callable[[], Optional[LetzEngine]], EngineStats]]
+        self.mocks = {}  # type: Dict[int, Tuple[Callable[[], Optional[Mock]], MockStats]]
+        self.retired = {'calls': 0, 'hits': 0, 'misses': 0, 'latency': 0.0}
+
+    def retire(self, calls, hits, misses, latency=0.0):
+        # type: (int, int, int, float) -> None
+        retired = self.retired
+        retired['calls'] += calls
+        retired['hits'] += hits
+        retired['misses'] += misses
+        retired['latency'] += latency
+
+    def instrument_mock(self, mock):
+        # type: (Mock) -> None
+        mock_attributes = vars(mock)
+        if '_letz_stub_stats' in mock_attributes:
+            return
+
+        mock_stats = mock_attributes['_letz_stub_stats'] = MockStats(next(self.mock_sequence))
+        for path, target in get_mock_targets(mock).items():
+            side_effect = target.side_effect
+            if isinstance(side_effect, SideEffect) and side_effect.counters is None:
+                side_effect.counters = mock_stats.get_counters(path)
+
+        def retire_mock(_):
+            self.mocks.pop(mock_stats.number, None)
+            for counters in mock_stats.counters.values():
+                self.retire(counters.calls, counters.calls - counters.misses, counters.misses)
+
+        self.mocks[mock_stats.number] = (ref(mock, retire_mock), mock_stats)
+
+    def instrument(self, engine):
+        # type: (LetzEngine) -> None
+        engine_stats = EngineStats(next(self.sequence))
+
+        def retire_engine(_):
+            self.engines.pop(engine_stats.number, None)
+            self.retire(engine_stats.calls, engine_stats.hits, engine_stats.misses, engine_stats.latency)
+
+        self.engines[engine_stats.number] = (ref(engine, retire_engine), engine_stats)
+        clock = self.clock
+        vars(engine).pop('get_answer', None)
+        vars(engine).pop('add_configuration', None)
+        vars(engine).pop('handle_call', None)
+        get_answer = engine.get_answer
+        add_configuration = engine.add_configuration
+        handle_call = engine.handle_call
+
+        def handle_counted_call(call):
+            engine_stats.counting = engine._call_action is DEFAULT_ACTION
+            handle_call(call)
+
+        def get_counted_answer(*args, **kwargs):
+            if not engine_stats.counting:
+                return get_answer(*args, **kwargs)
+            hits = engine_stats.hits
+            start = clock.time()
+            try:
+                return get_answer(*args, **kwargs)
+            finally:
+                engine_stats.calls += 1
+                engine_stats.latency += clock.time() - start
+                if engine_stats.hits == hits and isinstance(unwrap_answer(engine.answer), SignatureMatchingAnswer):
+                    engine_stats.misses += 1
+
+        def add_counted_configuration(call, answer):
+            stub_stats = StubStats(engine_stats, call, answer)
+            engine_stats.stubs.append(stub_stats)
+            add_configuration(call, stub_stats)
+
+        engine.handle_call = handle_counted_call
+        engine.get_answer = get_counted_answer
+        engine.add_configuration = add_counted_configuration
+
+    def name_engines(self):
+        """
+        Names the engines still alive after the path they are reached by from a letz nobody else holds.
+        """
+        engines = [(engine_ref(), stats) for engine_ref, stats in list(self.engines.values())]
+        engines = [(engine, stats) for engine, stats in engines if engine is not None]
+        engine_stats = dict((id(engine), stats) for engine, stats in engines)
+        parents = {}  # type: Dict[int, Tuple[int, str]]
+        for engine, _ in engines:
+            for name, attribute in engine.attributes.items():
+                if isinstance(attribute.content, Letz):
+                    parents[id(attribute.content.__engine__)] = (id(engine), '.' + name)
+            answer_letz = get_answer_letz(engine.answer)
+            if answer_letz is not None:
+                parents[id(answer_letz.__engine__)] = (id(engine), ANSWER_NAME)
+
+        def get_name(engine_id):
+            # type: (int) -> str
+            suffixes = []
+            visited = {engine_id}
+            while engine_id in parents and parents[engine_id][0] in engine_stats:
+                engine_id, suffix = parents[engine_id]
+                if engine_id in visited:
+                    break
+                visited.add(engine_id)
+                suffixes.append(suffix)
+            return 'letz{}'.format(engine_stats[engine_id].number) + ''.join(reversed(suffixes))
+
+        for engine, stats in engines:
+            stats.name = get_name(id(engine))
+
+    def get_report(self):
+        # type: () -> Dict[str, Any]
+        self.name_engines()
+        engines_stats = sorted((stats for _, stats in list(self.engines.values())),
+                               key=lambda stats: (-stats.calls, stats.number))
+        letzim = [stats.as_dict() for stats in engines_stats]
+        mocks = [stats for _, mock_stats in sorted(self.mocks.items()) for stats in mock_stats[1].as_dicts()]
+
+        report = dict(self.retired)
+        for stats in letzim + mocks:
+            report['calls'] += stats['calls']
+            report['hits'] += stats['hits']
+            report['misses'] += stats['misses']
+        report['latency'] += sum(stats['latency'] for stats in letzim)
+        report['letzim'] = [stats for stats in letzim if stats['calls'] or stats['stubs']]
+        report['mocks'] = [stats for stats in mocks if stats['calls'] or stats['stubs']]
+        report['unused_stubs'] = [stub['call'] for stats in letzim + mocks for stub in stats['stubs']
+                                  if not stub['hits']]
+        return report
+
+
+def get_hot_stubs(report, limit=10):
+    # type: (Dict[str, Any], Optional[int]) -> List[Dict[str, Any]]
+    stubs = [stub for stats in report['letzim'] + report['mocks'] for stub in stats['stubs'] if stub['hits']]
+    return sorted(stubs, key=lambda stub: -stub['hits'])[:limit]
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from pytest import raises
+from tstcls import TestClassBase
+
+from letz.aio import AwaitedCall, VirtualTimeEventLoop, AwaitableAnswer
+from letz.core import LetzController, Call, SequencedAnswer, AnswerConfigurationAction, Letz
+from letz.load import LoadModel
+
+
+class TestAsyncLetz(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.loop = VirtualTimeEventLoop()
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_async_letz()
+        self.tester_engine = self.letz_controller.get_engine(self.tester)
+
+    def teardown_test(self, **fixtures):
+        self.loop.close()
+
+    def test_call(self):
+        self.letz_controller.set_constant_answer(self.tester, 'value')
+
+        ###
+        awaitable = self.tester(1, key='value')
+        ###
+
+        assert isinstance(awaitable, AwaitableAnswer)
+        assert self.tester_engine.calls_log == [Call(1, key='value')]
+        assert self.loop.run_until_complete(awaitable) == 'value'
+        assert self.tester_engine.calls_log == [Call(1, key='value'), AwaitedCall(Call(1, key='value'))]
+
+    def test_call__sequenced_answer(self):
+        self.letz_controller.set_answer(self.tester, SequencedAnswer(['first', 'second']))
+
+        async def call_tester():
+            return [await self.tester(), await self.tester(), await self.tester()]
+
+        assert self.loop.run_until_complete(call_tester()) == ['first', 'second', 'second']
+
+    def test_call__signature_matching_answer(self):
+        self.tester_engine._call_action = AnswerConfigurationAction(lambda *_, **__: 'configured')
+        self.tester('expected')
+
+        async def call_tester():
+            return await self.tester('expected'), await self.tester('other')
+
+        configured, default = self.loop.run_until_complete(call_tester())
+
+        assert configured == 'configured'
+        assert default is None
+
+    def test_get_attr(self):
+        async def call_attribute():
+            return await self.tester.service.method()
+
+        answer = self.loop.run_until_complete(call_attribute())
+
+        assert isinstance(answer, Letz)
+        assert not isinstance(self.tester.service.method(), Letz)
+
+    def test_call__latency(self):
+        tester = self.letz_controller.create_async_letz(latency=30)
+        started = time.time()
+
+        ###
+        answer = self.loop.run_until_complete(tester.service.method())
+        ###
+
+        assert isinstance(answer, Letz)
+        assert self.loop.time() == 30
+        assert time.time() - started < 1
+
+    def test_call__simulated_load(self):
+        load_model = LoadModel(latency=10, concurrency=2, clock=self.loop.clock)
+        self.letz_controller.set_constant_answer(self.tester, 'value')
+        self.letz_controller.simulate_load(self.tester, load_model)
+        finished = []
+
+        async def call_tester(index):
+            await self.tester(index)
+            finished.append((index, self.loop.time()))
+
+        async def call_concurrently():
+            await asyncio.gather(*[call_tester(index) for index in range(5)])
+
+        ###
+        self.loop.run_until_complete(call_concurrently())
+        ###
+
+        assert finished == [(0, 10), (1, 10), (2, 20), (3, 20), (4, 30)]
+        assert self.tester_engine.calls_log[-1] == AwaitedCall(Call(4))
+
+    def test_call__latency_timeout(self):
+        tester = self.letz_controller.create_async_letz(latency=30)
+
+        with raises(asyncio.TimeoutError):
+            self.loop.run_until_complete(asyncio.wait_for(tester(), timeout=10))
+
+        assert 10 <= self.loop.time() < 30
+        assert tester.__engine__.calls_log == [Call()]
@@ -1,11 +1,17 @@
+import gc
+from itertools import count
+from weakref import ref
+
 from mock import Mock, call, MagicMock
 from pytest import fixture, raises
 
 from letz.aliases import instance_of, when, verify_no_more_interactions, magic_call, \
-    verify_zero_interaction, verify, times, never, in_order, at_least_once
+    verify_zero_interaction, verify, times, never, in_order, at_least_once, at_least, at_most, recorded, keep_last, \
+    keep_counts, keep_sample
 from letz.exceptions import NoInteractionWanted, NeverWantedButInvoked, \
     WantedButNotInvoked, TooLittleActualInvocations, TooManyActualInvocations, VerificationInOrderFailure, \
-    MocksException, ArgumentsAreDifferent
+    MocksException, ArgumentsAreDifferent, CallsDiscarded
+from letz.arrangements import get_mock_targets
 
 
 class TestWhen(object):
@@ -22,6 +28,46 @@ class TestWhen(object):
 
         assert self.tester.object_returning_method("blah") is None, "default behavior should return null"
 
+    def test_should_evaluate_latest_matcher_stubbing_before_older_exact_stubbing(self):
+        when(self.tester).has_a_call(call.object_returning_method(200)).then_return(200)
+        when(self.tester).has_a_call(call.object_returning_method(instance_of(int))).then_return(100)
+
+        assert 100 == self.tester.object_returning_method(200)
+        assert 100 == self.tester.object_returning_method(666)
+
+    def test_should_stub_many_calls(self):
+        for value in range(500):
+            when(self.tester).has_a_call(call.simple_method(value, key=str(value))).then_return(value * 2)
+
+        assert 20 == self.tester.simple_method(10, key='10')
+        assert 998 == self.tester.simple_method(499, key='499')
+        assert self.tester.simple_method(10, key='11') is None
+
+    def test_should_stub_unhashable_arguments(self):
+        when(self.tester).has_a_call(call.simple_method([1, 2], options={'a': 1})).then_return('list')
+
+        assert 'list' == self.tester.simple_method([1, 2], options={'a': 1})
+        assert self.tester.simple_method([1, 3], options={'a': 1}) is None
+
+    def test_should_return_chained_answers_and_repeat_the_last_one(self):
+        when(self.tester).has_a_call(call.simple_method()).then_return(1).then_raise(RuntimeError()).then_return(3)
+
+        assert 1 == self.tester.simple_method()
+        with raises(RuntimeError):
+            self.tester.simple_method()
+        assert 3 == self.tester.simple_method()
+        assert 3 == self.tester.simple_method()
+
+    def test_should_return_answers_from_lazy_iterable(self):
+        when(self.tester).has_a_call(call.simple_method()).then_return(0).then_return_from(count(1))
+
+        assert [0, 1, 2, 3] == [self.tester.simple_method() for _ in range(4)]
+
+    def test_should_repeat_last_answer_when_iterable_is_exhausted(self):
+        when(self.tester).has_a_call(call.simple_method()).then_return_from(iter([1, 2])).then_return_from([])
+
+        assert [1, 2, 2] == [self.tester.simple_method() for _ in range(3)]
+
     def test_should_stubbing_be_treated_as_interaction(self):
         when(self.tester).has_a_call(call.booleanReturningMethod()).then_return(True)
 
@@ -44,6 +90,100 @@ class TestWhen(object):
         verify_zero_interaction(self.tester)
 
 
+class TestBulkWhen(object):
+    @fixture(autouse=True)
+    def init(self):
+        self.tester = Mock()
+
+    def test_should_stub_calls_from_mapping(self):
+        when(self.tester).has_calls('inner.method', [(1, 'one'), ((1, 2), 'one two'), (call(1, key=2), 'with key')])
+
+        assert self.tester.inner.method(1) == 'one'
+        assert self.tester.inner.method(1, 2) == 'one two'
+        assert self.tester.inner.method(1, key=2) == 'with key'
+        assert self.tester.inner.method(2) is None
+
+    def test_should_stub_calls_from_pairs(self):
+        when(self.tester).has_calls(('method',), ((value, value * 2) for value in range(10000)))
+
+        assert self.tester.method(10) == 20
+        assert self.tester.method(9999) == 19998
+        assert self.tester.method.call_count == 2
+
+    def test_should_keep_stubbing_precedence(self):
+        when(self.tester).has_a_call(call.method(instance_of(int))).then_return('matcher')
+        when(self.tester).has_calls('method', [(1, 'bulk'), ((instance_of(str),), 'bulk matcher')])
+        when(self.tester).has_a_call(call.method(2)).then_return('exact')
+
+        assert self.tester.method(1) == 'bulk'
+        assert self.tester.method(2) == 'exact'
+        assert self.tester.method(3) == 'matcher'
+        assert self.tester.method('3') == 'bulk matcher'
+
+    def test_should_stub_calls_from_rows(self):
+        rows = [(1, 'a', 'first'), (2, 'b', 'second')]
+
+        when(self.tester).has_rows('method', rows)
+        when(self.tester).has_rows('other_method', rows, answer_column=0)
+
+        assert self.tester.method(2, 'b') == 'second'
+        assert self.tester.other_method('a', 'first') == 1
+
+    def test_should_reject_empty_rows(self):
+        with raises(ValueError):
+            when(self.tester).has_rows('method', [(1, 'first'), ()])
+
+
+class TestResolvedPaths(object):
+    @fixture(autouse=True)
+    def init(self):
+        self.tester = Mock()
+
+    def test_should_reuse_magic_call_children(self):
+        assert magic_call.inner.method is magic_call.inner.method
+        assert magic_call.inner.method(1) == call.inner.method(1)
+
+    def test_should_resolve_deep_path_once(self):
+        when(self.tester).has_a_call(magic_call.first.second.method(1)).then_return('one')
+        when(self.tester).has_a_call(magic_call.first.second.method(2)).then_return('two')
+
+        assert get_mock_targets(self.tester)[('first', 'second', 'method')] is self.tester.first.second.method
+        assert self.tester.first.second.method(1) == 'one'
+        assert self.tester.first.second.method(2) == 'two'
+
+    def test_should_forget_resolved_paths_on_reset(self):
+        when(self.tester).has_a_call(magic_call.inner.method(1)).then_return('one')
+
+        self.tester.reset_mock()
+
+        assert get_mock_targets(self.tester) == {}
+
+    def test_should_stub_spec_mocks(self):
+        class Service(object):
+            def get(self, key):
+                pass
+
+        spec_mock, spec_set_mock = Mock(spec=Service), Mock(spec_set=Service)
+
+        when(spec_mock).has_a_call(call.get(1)).then_return(5)
+        when(spec_set_mock).has_a_call(call.get(1)).then_return(6)
+
+        assert spec_mock.get(1) == 5
+        assert spec_set_mock.get(1) == 6
+        assert 'mock_targets' not in vars(spec_mock)
+        assert get_mock_targets(spec_set_mock)[('get',)] is spec_set_mock.get
+
+    def test_should_collect_stubbed_mocks(self):
+        stubbed_mock = Mock()
+        when(stubbed_mock).has_a_call(magic_call.inner.method(1)).then_return('one')
+        mock_ref = ref(stubbed_mock)
+
+        del stubbed_mock
+        gc.collect()
+
+        assert mock_ref() is None
+
+
 class TestVerify(object):
     @fixture(autouse=True)
     def init(self):
@@ -119,6 +259,32 @@ class TestVerify(object):
 
         verify(self.tester, times(2)).had_called_with(call.add('test'))
 
+    def test_should_report_all_unverified_calls(self):
+        self.tester.add('one')
+        self.tester.add('two')
+        self.tester.add('two')
+        self.tester.clear([])
+
+        verify(self.tester).had_called_with(call.add('one'))
+
+        with raises(NoInteractionWanted) as error:
+            verify_no_more_interactions(self.tester)
+
+        message = str(error.value)
+        assert 'found 3 unverified calls' in message
+        assert "call.add('two') x 2" in message
+        assert 'call.clear([]) x 1' in message
+        assert "call.add('one')" not in message
+
+    def test_should_verify_no_more_interactions_after_many_calls(self):
+        for index in range(10000):
+            self.tester.publish(index % 100)
+
+        for index in range(100):
+            verify(self.tester, times(100)).had_called_with(call.publish(index))
+
+        verify_no_more_interactions(self.tester)
+
     def test_should_allow_verifying_interaction_never_happened(self):
         self.tester.add('one')
 
@@ -129,6 +295,125 @@ class TestVerify(object):
             verify(self.tester, never()).had_called_with(call.add('one'))
 
 
+class TestRecordedVerify(TestVerify):
+    @fixture(autouse=True)
+    def init(self):
+        self.tester = recorded(Mock())
+
+    def test_should_verify_using_matchers(self):
+        self.tester.add(1)
+        self.tester.add(2)
+        self.tester.add('three')
+
+        verify(self.tester, times(2)).had_called_with(call.add(instance_of(int)))
+
+    def test_should_verify_unhashable_arguments(self):
+        self.tester.add([1])
+        self.tester.add([1])
+        self.tester.add({'a': 1})
+
+        verify(self.tester, times(2)).had_called_with(call.add([1]))
+        verify(self.tester).had_called_with(call.add({'a': 1}))
+
+    def test_should_verify_bounded_counts(self):
+        for _ in range(3):
+            self.tester.add('test')
+
+        verify(self.tester, at_least(2)).had_called_with(call.add('test'))
+        verify(self.tester, at_most(3)).had_called_with(call.add('test'))
+        with raises(TooManyActualInvocations):
+            verify(self.tester, at_most(2)).had_called_with(call.add('test'))
+        with raises(TooLittleActualInvocations):
+            verify(self.tester, at_least(4)).had_called_with(call.add('test'))
+
+    def test_should_keep_recording_after_reset(self):
+        self.tester.add('test')
+        verify(self.tester).had_called_with(call.add('test'))
+
+        self.tester.reset_mock()
+        self.tester.add('test')
+
+        verify(self.tester).had_called_with(call.add('test'))
+        verify_no_more_interactions(self.tester)
+
+    def test_should_count_like_mock_calls(self):
+        plain_mock = Mock()
+        for mock_instance in (plain_mock, self.tester):
+            mock_instance(1)
+            mock_instance.method(1)
+
+        for call_to_count in (call(1), call.method(1), magic_call(1), magic_call.method(1)):
+            assert self.tester.mock_calls.count(call_to_count) == plain_mock.mock_calls.count(call_to_count)
+        verify(self.tester).had_called_with(magic_call.method(1))
+
+
+class TestSpecVerify(object):
+    class Service(object):
+        def get(self, key):
+            pass
+
+    def test_should_verify_spec_mocks(self):
+        for tester in (Mock(spec=self.Service), recorded(Mock(spec=self.Service)), Mock(spec_set=self.Service)):
+            tester.get(1)
+
+            verify(tester).had_called_with(call.get(1))
+            verify_no_more_interactions(tester)
+
+    def test_should_verify_spec_mocks_in_order(self):
+        tester = Mock(spec=self.Service)
+        in_order_verifier = in_order(tester)
+        tester.get(1)
+        tester.get(2)
+
+        in_order_verifier.verify(tester).had_called_with(call.get(1))
+        in_order_verifier.verify(tester).had_called_with(call.get(2))
+
+
+class TestBoundedRecordedVerify(object):
+    def test_should_verify_counts_only(self):
+        tester = recorded(Mock(), keep_counts())
+        for index in range(100):
+            tester.add(index % 10)
+
+        verify(tester, times(10)).had_called_with(call.add(3))
+        assert len(tester.mock_calls) == 0
+        with raises(NoInteractionWanted):
+            verify_no_more_interactions(tester)
+
+    def test_should_verify_zero_interaction_on_discarded_calls(self):
+        counted_tester = recorded(Mock(), keep_counts())
+        sampled_tester = recorded(Mock(), keep_sample(2))
+        for tester in (counted_tester, sampled_tester):
+            when(tester).has_a_call(call.add(1)).then_return(2)
+            when(tester).has_a_call(call.add(2)).then_return(3)
+            verify_zero_interaction(tester)
+
+        counted_tester.add(1)
+
+        with raises(NoInteractionWanted):
+            verify_zero_interaction(counted_tester)
+
+    def test_should_fail_when_counted_calls_were_discarded(self):
+        tester = recorded(Mock(), keep_last(10))
+        for index in range(100):
+            tester.add(index % 10)
+
+        assert tester.mock_calls[-1] == call.add(9)
+        with raises(CallsDiscarded):
+            verify(tester, times(10)).had_called_with(call.add(3))
+        with raises(CallsDiscarded):
+            verify_no_more_interactions(tester)
+
+    def test_should_fail_in_order_when_calls_were_discarded(self):
+        tester = recorded(Mock(), keep_sample(2))
+        in_order_tester = in_order(tester)
+        tester.add(1)
+        tester.add(2)
+
+        with raises(CallsDiscarded):
+            in_order_tester.verify(tester).had_called_with(call.add(1))
+
+
 class TestInOrder(object):
     @fixture(autouse=True)
     def init(self):
@@ -285,6 +570,28 @@ class TestInOrder(object):
         with raises(NoInteractionWanted):
             verify_zero_interaction(self.mock_a)
 
+    def test_should_not_reparent_mocks(self):
+        assert self.mock_a._mock_parent is None
+        assert self.mock_a._mock_new_parent is None
+        assert repr(self.mock_a).startswith('<Mock id=')
+
+    def test_should_verify_calls_to_mock_itself(self):
+        self.mock_a('direct')
+
+        self.tester.verify(self.mock_a).had_called_with(call.simple_method(4))
+        self.tester.verify(self.mock_a).had_called_with(call('direct'))
+
+    def test_should_verify_calls_made_after_verification_started(self):
+        self.tester.verify(self.mock_a).had_called_with(call.simple_method(1))
+        self.tester.verify(self.mock_b, times(2)).had_called_with(call.simple_method(2))
+
+        self.mock_c.simple_method(5)
+
+        self.tester.verify(self.mock_c).had_called_with(call.simple_method(3))
+        self.tester.verify(self.mock_b).had_called_with(call.simple_method(2))
+        self.tester.verify(self.mock_a).had_called_with(call.simple_method(4))
+        self.tester.verify(self.mock_c).had_called_with(call.simple_method(5))
+
     def test_should_scream_when_null_passed(self):
         with raises(MocksException):
             in_order(None)
@@ -0,0 +1,151 @@
+from mock import call
+from pytest import fixture, raises
+
+from letz.aliases import verify
+from letz.cassettes import Cassette, CassetteRecorder, get_call_digest
+from letz.core import LetzController
+from letz.exceptions import UnrecordedCall
+
+
+class Key(object):
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Key) and self.value == other.value
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class Session(object):
+    def get(self, key):
+        return key.value * 10
+
+
+class Database(object):
+    name = 'database'
+
+    def __init__(self):
+        self.counter = 0
+        self.session = Session()
+
+    def query(self, statement, limit=None):
+        self.counter += 1
+        return [statement, limit, self.counter]
+
+    def fail(self, reason):
+        raise ValueError(reason)
+
+    def __call__(self, value):
+        return value * 2
+
+
+class TestCassettes(object):
+    @fixture(autouse=True)
+    def init(self, tmpdir):
+        self.cassette_path = str(tmpdir.join('database.cassette'))
+
+        recorder = CassetteRecorder(Database())
+        database = recorder.proxy
+        database.query('select 1')
+        database.query('select 1')
+        database.query('select 2', limit=10)
+        database(21)
+        with raises(ValueError):
+            database.fail('broken')
+        assert database.name == 'database'
+        database.query(Key(1))
+        database.query(Key(2))
+        database.session.get(Key(1))
+        database.session.get(Key(2))
+        recorder.save(self.cassette_path)
+
+    def test_replay_letz(self):
+        with Cassette(self.cassette_path) as cassette:
+            database = cassette.create_letz(LetzController())
+
+            assert database.query('select 1') == ['select 1', None, 1]
+            assert database.query('select 1') == ['select 1', None, 2]
+            assert database.query('select 1') == ['select 1', None, 2]
+            assert database.query('select 2', limit=10) == ['select 2', 10, 3]
+            assert database(21) == 42
+            with raises(ValueError):
+                database.fail('broken')
+            assert len(database.query.__engine__.calls_log) == 4
+
+    def test_replay_mock(self):
+        with Cassette(self.cassette_path) as cassette:
+            database = cassette.create_mock()
+
+            assert database.query('select 2', limit=10) == ['select 2', 10, 3]
+            assert database(21) == 42
+            database.query.assert_called_once_with('select 2', limit=10)
+            verify(database).had_called_with(call.query('select 2', limit=10))
+
+    def test_replay_nested_attributes(self):
+        with Cassette(self.cassette_path) as cassette:
+            for database in (cassette.create_letz(), cassette.create_mock()):
+                assert database.session.get(Key(2)) == 20
+                assert database.session.get(Key(1)) == 10
+                with raises(UnrecordedCall):
+                    database.session.get(Key(3))
+
+    def test_unrecorded_path(self):
+        with Cassette(self.cassette_path) as cassette:
+            for database in (cassette.create_letz(), cassette.create_mock()):
+                with raises(AttributeError):
+                    database.update
+                with raises(AttributeError):
+                    database.session.put
+                with raises(UnrecordedCall):
+                    database.session()
+
+    def test_replay_equal_arguments(self):
+        with Cassette(self.cassette_path) as cassette:
+            database = cassette.create_letz()
+
+            assert database.query(Key(2)) == [Key(2), None, 5]
+            assert database.query(Key(1)) == [Key(1), None, 4]
+            with raises(UnrecordedCall):
+                database.query(Key(3))
+
+    def test_unrecorded_call(self):
+        with Cassette(self.cassette_path) as cassette:
+            database = cassette.create_letz()
+
+            with raises(UnrecordedCall):
+                database.query('select 3')
+            with raises(UnrecordedCall):
+                database.query('select 1', limit=1)
+
+    def test_lazy_loading(self):
+        with Cassette(self.cassette_path) as cassette:
+            database = cassette.create_letz()
+            assert cassette.answers == {}
+
+            database.query('select 1')
+
+            assert len(cassette.answers) == 1
+
+    def test_call_digest(self):
+        text = ''.join(['a', 'b'])
+
+        assert get_call_digest((), (text, text), {}) == get_call_digest((), ('ab', ''.join(text)), {})
+        assert get_call_digest((), (frozenset([1, 9]),), {}) == get_call_digest((), (frozenset([9, 1]),), {})
+        assert get_call_digest((), ({'a': 1, 'b': 2},), {}) == get_call_digest((), ({'b': 2, 'a': 1},), {})
+        assert get_call_digest((), ((1,),), {}) != get_call_digest((), ([1],), {})
+
+    def test_not_a_cassette(self, tmpdir):
+        file_path = tmpdir.join('other')
+        file_path.write('some content which is not a cassette')
+
+        with raises(ValueError):
+            Cassette(str(file_path))
+
+    def test_empty_file(self, tmpdir):
+        file_path = tmpdir.join('empty')
+        file_path.write('')
+
+        with raises(ValueError):
+            Cassette(str(file_path))
@@ -1,5 +1,26 @@
+import gc
+import json
+import threading
+from itertools import count
+from types import ModuleType
+
+try:
+    from inspect import Signature, Parameter
+except ImportError:
+    from funcsigs import Signature, Parameter
+
+from mock import Mock, call
+from pytest import raises
 from tstcls import TestClassBase
-from letz.core import Letz, LetzController
+
+from letz.aliases import when
+from letz.arrangements import TypePredicate
+from letz.clocks import VirtualClock
+from letz.exceptions import CallsDiscarded, MocksException
+from letz.core import Letz, CallableLetz, LetzController, CallSignatureCheckerFactory, AnswerConfigurationAction, \
+    SequencedAnswer, Call
+from letz.recording import CompactCallLog, keep_last, keep_counts, keep_sample, keep_compact
+from letz.stats import get_hot_stubs
 
 
 class TestLetz(TestClassBase):
@@ -21,6 +42,15 @@ class TestLetz(TestClassBase):
         assert isinstance(answer, Letz)
         assert self.other_letz() != answer
 
+    def test_create_letz__shares_classes(self):
+        ###
+        non_callable_letz = self.letz_controller.create_letz(is_callable=False)
+        ###
+
+        assert type(self.tester) is CallableLetz
+        assert type(self.tester.some_attribute) is type(self.other_letz.other_attribute)
+        assert type(non_callable_letz) is Letz
+
     def test_call_with_signature(self):
         other_letz = self.letz_controller.create_singed_letz(lambda first, second: None)
 
@@ -71,3 +101,739 @@ class TestLetz(TestClassBase):
         assert 'some_attribute' in self.tester.__engine__.attributes
         assert self.tester.__engine__.attributes['some_attribute'].content is None
         assert self.other_letz.some_attribute is not None
+
+
+class TestCall(object):
+    def test_equality(self):
+        assert Call(1, a=1, b=2) == Call(1, b=2, a=1)
+        assert Call(1, a=1) != Call(1, a=2)
+        assert Call(1) != Call(2)
+        assert Call(1, a=1) == ((1,), {'a': 1})
+        assert Call(1) != object()
+
+    def test_equality__cached_hashes(self):
+        first_call, second_call, third_call = Call(1), Call(1), Call(2)
+        hash(first_call), hash(second_call), hash(third_call)
+
+        assert first_call == second_call
+        assert first_call != third_call
+
+    def test_equality__matchers(self):
+        matcher_call = Call(TypePredicate(int))
+        hash(Call(1))
+
+        assert Call(1) == matcher_call
+        assert matcher_call == Call(1)
+        assert Call('1') != matcher_call
+
+    def test_hash(self):
+        calls = {Call(1, a=1): 'first', Call(1, b=1): 'second'}
+
+        assert calls[Call(1, a=1)] == 'first'
+        assert Call(1, b=1) in calls
+        assert len({Call(1), Call(1), Call(2)}) == 2
+
+    def test_hash__unhashable(self):
+        with raises(TypeError):
+            hash(Call([1]))
+        with raises(TypeError):
+            hash(Call(key=TypePredicate(int)))
+
+    def test_unpacking(self):
+        args, kwargs = Call(1, a=1)
+
+        assert args == (1,)
+        assert kwargs == {'a': 1}
+        assert Call(1, a=1)[0] == (1,)
+
+    def test_repr(self):
+        assert repr(Call(1, a='1')) == "<Call args=(1,) kwargs={'a': '1'}>"
+
+
+class TestSignatureMatchingAnswer(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_letz()
+        self.tester_engine = self.letz_controller.get_engine(self.tester)
+
+    def configure(self, answer_value, *args, **kwargs):
+        self.tester_engine._call_action = AnswerConfigurationAction(lambda *_, **__: answer_value)
+        self.tester(*args, **kwargs)
+
+    def test_call(self):
+        self.configure('first', 1, key='value')
+        self.configure('second', 2)
+
+        ###
+        answers = [self.tester(1, key='value'), self.tester(2), self.tester(3)]
+        ###
+
+        assert answers == ['first', 'second', None]
+
+    def test_call__latest_configuration_wins(self):
+        self.configure('exact', 1)
+        self.configure('matcher', TypePredicate(int))
+        self.configure('newer exact', 2)
+
+        ###
+        answers = [self.tester(1), self.tester(2), self.tester(3), self.tester('1')]
+        ###
+
+        assert answers == ['matcher', 'newer exact', 'matcher', None]
+
+    def test_call__unhashable_arguments(self):
+        self.configure('list', [1, 2], key={'a': 1})
+
+        ###
+        answers = [self.tester([1, 2], key={'a': 1}), self.tester([1, 2], key={'a': 2})]
+        ###
+
+        assert answers == ['list', None]
+
+    def test_call__previous_answer_as_fallback(self):
+        self.letz_controller.set_answer(self.tester, SequencedAnswer(['s1', 's2']))
+        self.configure('configured', 1)
+
+        ###
+        answers = [self.tester(1), self.tester(), self.tester(2)]
+        ###
+
+        assert answers == ['configured', 's1', 's2']
+
+
+class TestSequencedAnswer(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_letz()
+        self.answer = SequencedAnswer(['first'])
+        self.letz_controller.set_answer(self.tester, self.answer)
+
+    def test_call(self):
+        self.answer.add_value('second')
+
+        ###
+        answers = [self.tester() for _ in range(3)]
+        ###
+
+        assert answers == ['first', 'second', 'second']
+
+    def test_call__lazy_values(self):
+        self.answer.add_values(iter(range(3)))
+        self.answer.add_value('last')
+
+        ###
+        answers = [self.tester() for _ in range(6)]
+        ###
+
+        assert answers == ['first', 0, 1, 2, 'last', 'last']
+
+    def test_call__unbounded_values(self):
+        self.answer.add_values(count())
+
+        ###
+        answers = [self.tester() for _ in range(10000)]
+        ###
+
+        assert answers[-1] == 9998
+
+
+class TestLetzController(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_letz()
+
+    def test_create_letz__unreachable_letz_collected(self):
+        other_letz = self.letz_controller.create_letz()
+        other_letz.some_attribute.other_attribute()
+
+        ###
+        del other_letz
+        gc.collect()
+        ###
+
+        assert list(self.letz_controller.letzim.keys()) == [self.tester]
+
+    def test_dispose(self):
+        child = self.tester.child
+        grandchild_answer = child.grandchild()
+        sibling = self.letz_controller.create_letz()
+
+        ###
+        self.letz_controller.dispose(self.tester)
+        ###
+
+        assert set(self.letz_controller.letzim.keys()) == {sibling}
+        assert self.tester.__engine__.attributes == {}
+        assert child.__engine__.attributes == {}
+        assert grandchild_answer not in self.letz_controller.letzim
+
+    def test_dispose_assigned_letz(self):
+        other = self.letz_controller.create_letz()
+        self.letz_controller.set_constant_answer(other, 'answer')
+        self.tester.dependency = other
+        self.letz_controller.set_constant_answer(self.tester.child, other)
+
+        ###
+        self.letz_controller.dispose(self.tester)
+        ###
+
+        assert other in self.letz_controller.letzim
+        assert other() == 'answer'
+
+    def test_reset(self):
+        self.tester.child()
+
+        ###
+        self.letz_controller.reset()
+        ###
+
+        assert list(self.letz_controller.letzim.keys()) == [self.tester]
+        assert self.tester.__engine__.attributes == {}
+        self.letz_controller.set_constant_answer(self.tester, 'answer')
+        assert self.letz_controller.get_engine(self.tester) is self.tester.__engine__
+
+
+class TestCallSignatureCheckerFactory(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+
+    def test_create(self):
+        def model(first, second=2, *args, **kwargs):
+            pass
+
+        ###
+        checker = CallSignatureCheckerFactory.create(model)
+        ###
+
+        checker(1)
+        checker(1, 2, 3, other=4)
+        for args, kwargs in [((), {}), ((1,), {'first': 1}), ((), {'second': 2})]:
+            with raises(TypeError):
+                checker(*args, **kwargs)
+
+    def test_create__keyword_and_positional_only(self):
+        def model(*args, **kwargs):
+            pass
+
+        model.__signature__ = Signature([
+            Parameter('first', Parameter.POSITIONAL_ONLY),
+            Parameter('second', Parameter.POSITIONAL_OR_KEYWORD, default=None),
+            Parameter('third', Parameter.KEYWORD_ONLY),
+            Parameter('fourth', Parameter.KEYWORD_ONLY, default=None),
+        ])
+
+        ###
+        checker = CallSignatureCheckerFactory.create(model)
+        ###
+
+        checker(1, third=3)
+        checker(1, second=2, third=3, fourth=4)
+        for args, kwargs in [((1,), {}), ((), {'first': 1, 'third': 3}), ((1, 2, 3), {'third': 3})]:
+            with raises(TypeError):
+                checker(*args, **kwargs)
+
+    def test_create__cached(self):
+        class Model(object):
+            def method(self, first):
+                pass
+
+        model = Model()
+
+        ###
+        checkers = [CallSignatureCheckerFactory.create(model.method) for _ in range(2)]
+        ###
+
+        assert checkers[0] is checkers[1]
+        checkers[0](1)
+        with raises(TypeError):
+            checkers[0](model, 1)
+
+    def test_create__bound_var_positional(self):
+        class Model(object):
+            def method(*args, **kwargs):
+                pass
+
+        model = Model()
+        spec_letz = self.letz_controller.create_spec_letz(Model)
+
+        ###
+        signed_letz = self.letz_controller.create_singed_letz(model.method)
+        ###
+
+        signed_letz(1)
+        spec_letz.method(1, key=2)
+        CallSignatureCheckerFactory.create(Model.method, bound=True)()
+
+    def test_call_with_signature__wrong_arguments(self):
+        other_letz = self.letz_controller.create_singed_letz(lambda first, second=None: None)
+
+        other_letz(1)
+        with raises(TypeError):
+            other_letz(1, 2, 3)
+
+
+class SpecModel(object):
+    constant = 1
+
+    def method(self, first, second=None):
+        pass
+
+    @staticmethod
+    def static_method(first):
+        pass
+
+    @classmethod
+    def class_method(cls, first):
+        pass
+
+    def __call__(self, first):
+        pass
+
+
+class TestSpecLetz(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_spec_letz(SpecModel)
+
+    def test_create_spec_letz(self):
+        assert isinstance(self.tester, CallableLetz)
+        assert self.tester.__engine__.attributes == {}
+
+    def test_get_attr(self):
+        ###
+        method = self.tester.method
+        ###
+
+        method(1)
+        method(1, second=2)
+        with raises(TypeError):
+            method()
+        assert self.tester.method is method
+
+    def test_get_attr__static_and_class_methods(self):
+        self.tester.static_method(1)
+        self.tester.class_method(1)
+        with raises(TypeError):
+            self.tester.static_method(1, 2)
+        with raises(TypeError):
+            self.tester.class_method()
+
+    def test_get_attr__missing(self):
+        with raises(AttributeError):
+            getattr(self.tester, 'missing_method')
+
+    def test_call(self):
+        self.tester(1)
+        with raises(TypeError):
+            self.tester(1, 2)
+
+    def test_create_spec_letz__module(self):
+        module = ModuleType('spec_module')
+        module.function = lambda first: None
+        module.value = 1
+
+        ###
+        tester = self.letz_controller.create_spec_letz(module)
+        ###
+
+        assert not isinstance(tester, CallableLetz)
+        tester.function(1)
+        with raises(TypeError):
+            tester.function()
+        assert isinstance(tester.value, Letz)
+
+
+class TestConcurrentLetz(TestClassBase):
+    THREADS_COUNT = 8
+    CALLS_COUNT = 2000
+
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController(concurrent=True)
+        self.tester = self.letz_controller.create_letz()
+        self.tester_engine = self.letz_controller.get_engine(self.tester)
+
+    def run_in_threads(self, target):
+        threads = [threading.Thread(target=target, args=(index,)) for index in range(self.THREADS_COUNT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_call(self):
+        def call_tester(index):
+            for call_index in range(self.CALLS_COUNT):
+                self.tester(index, call_index)
+
+        ###
+        self.run_in_threads(call_tester)
+        ###
+
+        assert len(self.tester_engine.calls_log) == self.THREADS_COUNT * self.CALLS_COUNT
+        assert len(set(call.args for call in self.tester_engine.calls_log)) == self.THREADS_COUNT * self.CALLS_COUNT
+
+    def test_get_attr(self):
+        attributes = []
+
+        ###
+        self.run_in_threads(lambda index: attributes.append(self.tester.some_attribute.other_attribute))
+        ###
+
+        assert len(set(attributes)) == 1
+
+    def test_call__arrangement_is_per_thread(self):
+        arranging = threading.Event()
+        called = threading.Event()
+        answers = []
+
+        def arrange():
+            self.tester_engine._call_action = AnswerConfigurationAction(lambda *_, **__: 'configured')
+            arranging.set()
+            called.wait()
+            self.tester('configured')
+
+        def call_tester():
+            arranging.wait()
+            answers.append(self.tester('configured'))
+            called.set()
+
+        arranging_thread = threading.Thread(target=arrange)
+        calling_thread = threading.Thread(target=call_tester)
+
+        ###
+        arranging_thread.start()
+        calling_thread.start()
+        arranging_thread.join()
+        calling_thread.join()
+        ###
+
+        assert len(self.tester_engine.calls_log) == 1
+        assert isinstance(answers[0], Letz)
+        assert self.tester('configured') == 'configured'
+        assert self.tester('other') == answers[0]
+
+
+class TestRecordingPolicy(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_letz()
+        self.tester_engine = self.letz_controller.get_engine(self.tester)
+
+    def call_tester(self, calls_count):
+        for index in range(calls_count):
+            self.tester(index % 3)
+
+    def test_keep_all(self):
+        self.call_tester(10)
+
+        assert len(self.tester_engine.calls_log) == 10
+        assert self.tester_engine.count_calls(Call(0)) == 4
+
+    def test_keep_last(self):
+        self.letz_controller.set_recording_policy(self.tester, keep_last(4))
+
+        ###
+        self.call_tester(10)
+        ###
+
+        assert 4 <= len(self.tester_engine.calls_log) < 8
+        assert self.tester_engine.calls_log[-1] == Call(0)
+        with raises(CallsDiscarded):
+            self.tester_engine.count_calls(Call(0))
+
+    def test_keep_last__not_discarded_yet(self):
+        self.letz_controller.set_recording_policy(self.tester, keep_last(4))
+
+        ###
+        self.call_tester(3)
+        ###
+
+        assert self.tester_engine.count_calls(Call(0)) == 1
+
+    def test_keep_counts(self):
+        self.letz_controller.set_recording_policy(self.tester, keep_counts())
+
+        ###
+        self.call_tester(10)
+        self.tester([])
+        ###
+
+        assert len(self.tester_engine.calls_log) == 0
+        assert self.tester_engine.count_calls(Call(0)) == 4
+        with raises(CallsDiscarded):
+            self.tester_engine.count_calls(Call([]))
+
+    def test_keep_sample(self):
+        self.letz_controller.set_recording_policy(self.tester, keep_sample(3))
+
+        ###
+        self.call_tester(10)
+        ###
+
+        assert list(self.tester_engine.calls_log) == [Call(0)] * 4
+        with raises(CallsDiscarded):
+            self.tester_engine.count_calls(Call(0))
+
+    def test_controller_recording_policy(self):
+        letz_controller = LetzController(concurrent=True, recording_policy=keep_counts().counted())
+        tester = letz_controller.create_letz()
+
+        ###
+        tester.some_attribute(1)
+        ###
+
+        assert tester.some_attribute.__engine__.count_calls(Call(1)) == 1
+
+
+class TestCompactCallLog(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController(recording_policy=keep_compact())
+        self.tester = self.letz_controller.create_letz()
+        self.tester_engine = self.letz_controller.get_engine(self.tester)
+
+    def test_materialize_calls(self):
+        ###
+        self.tester(1, key='value')
+        self.tester.some_attribute([1])
+        self.tester(1, key='value')
+        ###
+
+        assert isinstance(self.tester_engine.calls_log, CompactCallLog)
+        assert self.tester_engine.calls_log == [Call(1, key='value'), Call(1, key='value')]
+        assert self.tester_engine.calls_log[0] == Call(1, key='value')
+        assert self.tester.some_attribute.__engine__.calls_log[:] == [Call([1])]
+
+    def test_count_calls(self):
+        ###
+        for index in range(10):
+            self.tester(index % 3)
+        ###
+
+        assert self.tester_engine.count_calls(Call(0)) == 4
+        assert self.tester_engine.count_calls(Call(3)) == 0
+        assert self.tester_engine.count_calls(Call(TypePredicate(int))) == 10
+
+    def test_count_unhashable_calls(self):
+        ###
+        self.tester([1])
+        self.tester([1])
+        self.tester(1)
+        ###
+
+        assert self.tester_engine.count_calls(Call([1])) == 2
+        assert self.tester_engine.count_calls(Call(1)) == 1
+
+    def test_intern_values(self):
+        ###
+        self.tester('-'.join(('some', 'value')), 1)
+        self.tester('-'.join(('some', 'value')), 2)
+        ###
+
+        first_call, second_call = self.tester_engine.calls_log
+        assert first_call.args[0] is second_call.args[0]
+
+    def test_keep_distinguishable_values(self):
+        ###
+        self.tester(-0.0)
+        self.tester(0.0)
+        ###
+
+        assert [repr(call.args[0]) for call in self.tester_engine.calls_log] == ['-0.0', '0.0']
+        assert self.tester_engine.count_calls(Call(0.0)) == 2
+
+    def test_keep_value_types(self):
+        ###
+        self.tester(1)
+        self.tester(True)
+        self.tester(1)
+        ###
+
+        assert [call.args[0].__class__ for call in self.tester_engine.calls_log] == [int, bool, int]
+        assert self.tester_engine.count_calls(Call(1)) == 3
+
+    def test_release_trimmed_calls(self):
+        self.letz_controller.set_recording_policy(self.tester, keep_last(10).compacted())
+        interner = self.letz_controller.call_recorder.interner
+
+        ###
+        for index in range(1000):
+            self.tester('value-{}'.format(index), key=index)
+        ###
+
+        assert len(interner) == len(self.tester_engine.calls_log) < 20
+        assert len(interner.values) == 2 * len(self.tester_engine.calls_log)
+        assert self.tester_engine.calls_log[-1] == Call('value-999', key=999)
+
+    def test_release_disposed_calls(self):
+        self.tester(1)
+        self.tester(1.5)
+        interner = self.letz_controller.call_recorder.interner
+
+        ###
+        self.letz_controller.dispose(self.tester)
+        ###
+
+        assert len(interner) == 0
+        assert interner.values == {}
+
+    def test_records(self):
+        ###
+        self.tester(1)
+        self.tester.some_attribute(2)
+        self.tester(3)
+        ###
+
+        records = list(self.tester_engine.calls_log.records())
+        attribute_records = list(self.tester.some_attribute.__engine__.calls_log.records())
+        assert [call for _, _, call in records] == [Call(1), Call(3)]
+        assert records[0][0] < attribute_records[0][0] < records[1][0]
+        assert records[0][1] <= attribute_records[0][1] <= records[1][1]
+
+    def test_keep_last(self):
+        self.letz_controller.set_recording_policy(self.tester, keep_last(4).compacted())
+
+        ###
+        for index in range(10):
+            self.tester(index)
+        ###
+
+        assert list(self.tester_engine.calls_log)[-4:] == [Call(6), Call(7), Call(8), Call(9)]
+        assert 4 <= len(self.tester_engine.calls_log) < 8
+        with raises(CallsDiscarded):
+            self.tester_engine.count_calls(Call(9))
+
+    def test_reset(self):
+        self.tester(1)
+
+        ###
+        self.letz_controller.reset()
+        ###
+
+        assert self.letz_controller.call_recorder is None
+        assert len(self.tester_engine.calls_log) == 0
+
+    def test_record_in_threads(self):
+        letz_controller = LetzController(concurrent=True, recording_policy=keep_compact())
+        testers = [letz_controller.create_letz() for _ in range(8)]
+
+        def call_tester(index):
+            for call_index in range(500):
+                testers[index]('value-{}'.format(call_index % 50), index)
+
+        threads = [threading.Thread(target=call_tester, args=(index,)) for index in range(len(testers))]
+
+        ###
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ###
+
+        for index, tester in enumerate(testers):
+            assert list(tester.__engine__.calls_log) == [Call('value-{}'.format(call_index % 50), index)
+                                                         for call_index in range(500)]
+        assert len(letz_controller.call_recorder.interner) == 50 * len(testers)
+
+
+class TestLetzStats(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.clock = VirtualClock()
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_letz()
+        self.letz_controller.enable_stats(self.clock)
+        self.tester_engine = self.letz_controller.get_engine(self.tester)
+
+    def configure(self, letz, answer, *args, **kwargs):
+        letz.__engine__._call_action = AnswerConfigurationAction(answer)
+        letz(*args, **kwargs)
+
+    def slow_answer(self, value):
+        def answer(*_, **__):
+            self.clock.advance(0.5)
+            return value
+
+        return answer
+
+    def test_stats(self):
+        self.configure(self.tester.method, self.slow_answer('first'), 1, key='value')
+        self.configure(self.tester.method, self.slow_answer('second'), 2)
+
+        ###
+        for _ in range(3):
+            self.tester.method(1, key='value')
+        self.tester.method(3)
+        self.tester.other()
+        stats = json.loads(json.dumps(self.letz_controller.stats()))
+        ###
+
+        assert (stats['calls'], stats['hits'], stats['misses'], stats['latency']) == (5, 3, 1, 1.5)
+        assert stats['letzim'][0] == {
+            'name': 'letz0.method', 'calls': 4, 'hits': 3, 'misses': 1, 'latency': 1.5,
+            'stubs': [{'call': "letz0.method(1, key='value')", 'hits': 3}, {'call': 'letz0.method(2)', 'hits': 0}],
+        }
+        assert stats['letzim'][1]['name'] == 'letz0.other'
+        assert stats['unused_stubs'] == ['letz0.method(2)']
+        assert get_hot_stubs(stats) == [{'call': "letz0.method(1, key='value')", 'hits': 3}]
+
+    def test_stats__not_enabled(self):
+        with raises(MocksException):
+            LetzController().stats()
+
+    def test_enable_stats__leaves_other_controllers_alone(self):
+        other_letz = LetzController().create_letz()
+
+        assert 'get_answer' not in vars(other_letz.__engine__)
+        assert 'get_answer' in vars(self.tester_engine)
+
+    def test_reset(self):
+        self.tester()
+
+        ###
+        self.letz_controller.reset()
+        self.letz_controller.create_letz()()
+        ###
+
+        assert self.letz_controller.stats()['calls'] == 1
+
+    def test_retire_collected_letzim(self):
+        self.configure(self.tester.method, self.slow_answer('first'), 1)
+        self.tester.method(1)
+        self.tester.method(2)
+
+        ###
+        del self.tester, self.tester_engine
+        gc.collect()  # collects the letzim, and drops their engines from the registry
+        gc.collect()
+        stats = self.letz_controller.stats()
+        ###
+
+        assert (stats['calls'], stats['hits'], stats['misses'], stats['latency']) == (2, 1, 1, 0.5)
+        assert stats['letzim'] == []
+        assert self.letz_controller.stats_collector.engines == {}
+
+    def test_count_stubs(self):
+        tester = Mock()
+        when(tester).has_a_call(call.method(1)).then_return('before')
+        self.letz_controller.count_stubs(tester)
+        when(tester).has_a_call(call.method(2)).then_return('after')
+        when(tester).has_calls('other', {1: 'one', 2: 'two'})
+
+        ###
+        tester.method(2)
+        tester.method(3)
+        tester.other(1)
+        stats = self.letz_controller.stats()
+        ###
+
+        assert (stats['calls'], stats['hits'], stats['misses']) == (3, 2, 1)
+        assert stats['mocks'] == [
+            {'name': 'mock0.method', 'calls': 2, 'hits': 1, 'misses': 1,
+             'stubs': [{'call': 'mock0.method(2)', 'hits': 1}]},
+            {'name': 'mock0.other', 'calls': 1, 'hits': 1, 'misses': 0,
+             'stubs': [{'call': 'mock0.other(1)', 'hits': 1}, {'call': 'mock0.other(2)', 'hits': 0}]},
+        ]
+        assert stats['unused_stubs'] == ['mock0.other(2)']
+        assert get_hot_stubs(stats) == [{'call': 'mock0.method(2)', 'hits': 1}, {'call': 'mock0.other(1)', 'hits': 1}]
+
+    def test_count_stubs__not_enabled(self):
+        with raises(MocksException):
+            LetzController().count_stubs(Mock())
@@ -0,0 +1,131 @@
+import threading
+
+from mock import Mock, call
+from pytest import raises
+
+from letz.aliases import when, LoadModel, UniformLatency, ExponentialLatency, SampledLatency
+from letz.clocks import VirtualClock
+from letz.core import Letz, LetzController, AnswerConfigurationAction, SimulatedAnswer
+from letz.exceptions import SimulatedError
+
+
+class GatheringClock(VirtualClock):
+    """
+    Holds the sleeping threads until `count` of them sleep, as if their calls arrived together.
+    """
+
+    def __init__(self, count):
+        super(GatheringClock, self).__init__()
+        self.count = count
+        self.condition = threading.Condition()
+
+    def sleep_until(self, deadline):
+        with self.condition:
+            self.count -= 1
+            self.condition.notify_all()
+            while self.count > 0:
+                self.condition.wait()
+        super(GatheringClock, self).sleep_until(deadline)
+
+
+class TestLoadModel(object):
+    def setup_method(self):
+        self.clock = VirtualClock()
+
+    def test_latency(self):
+        load_model = LoadModel(latency=2, clock=self.clock)
+
+        assert load_model.answer(lambda value: value * 2, (3,), {}) == 6
+        assert self.clock.time() == 2
+
+    def test_latency_distributions(self):
+        uniform = LoadModel(latency=UniformLatency(1, 2), seed=1, clock=self.clock)
+        exponential = LoadModel(latency=ExponentialLatency(2, minimum=1), seed=1, clock=self.clock)
+        sampled = LoadModel(latency=SampledLatency([3, 5]), seed=1, clock=self.clock)
+
+        assert all(1 <= uniform.reserve()[0] <= 2 for _ in range(100))
+        assert all(exponential.reserve()[0] >= 1 for _ in range(100))
+        assert set(sampled.reserve()[0] for _ in range(100)) == {3, 5}
+        assert [LoadModel(UniformLatency(1, 2), seed=1, clock=self.clock).reserve()[0] for _ in range(2)] == \
+            [LoadModel(UniformLatency(1, 2), seed=1, clock=self.clock).reserve()[0] for _ in range(2)]
+
+    def test_concurrency(self):
+        load_model = LoadModel(latency=10, concurrency=2, clock=self.clock)
+
+        ###
+        deadlines = [load_model.reserve()[0] for _ in range(5)]
+        self.clock.advance(25)
+        later_deadline, _ = load_model.reserve()
+        ###
+
+        assert deadlines == [10, 10, 20, 20, 30]
+        assert later_deadline == 35
+        assert load_model.queued_time == 10 + 10 + 20
+
+    def test_concurrent_calls(self):
+        clock = GatheringClock(4)
+        load_model = LoadModel(latency=10, concurrency=4, clock=clock)
+        threads = [threading.Thread(target=load_model.answer, args=(lambda: None, (), {})) for _ in range(4)]
+
+        ###
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ###
+
+        assert clock.time() == 10
+        assert load_model.calls == 4
+
+    def test_error_rate(self):
+        load_model = LoadModel(error_rate=0.25, seed=2, clock=self.clock)
+
+        failures = [load_model.reserve()[1] for _ in range(1000)]
+
+        assert 200 < sum(failures) < 300
+        assert load_model.failures == sum(failures)
+        with raises(SimulatedError):
+            LoadModel(error_rate=1).answer(lambda: None, (), {})
+        with raises(KeyError):
+            LoadModel(error_rate=1, error=KeyError('key')).answer(lambda: None, (), {})
+
+    def test_invalid(self):
+        with raises(ValueError):
+            LoadModel(concurrency=0)
+        with raises(ValueError):
+            LoadModel(error_rate=2)
+
+
+class TestSimulatedAnswers(object):
+    def setup_method(self):
+        self.clock = VirtualClock()
+        self.load_model = LoadModel(latency=3, clock=self.clock)
+
+    def test_letz(self):
+        letz_controller = LetzController()
+        tester = letz_controller.create_letz()
+        letz_controller.simulate_load(tester, self.load_model)
+
+        ###
+        tester.__engine__._call_action = AnswerConfigurationAction(lambda *_, **__: 'configured')
+        tester(1)
+        configured, default = tester(1), tester(2)
+        ###
+
+        assert isinstance(tester.__engine__.answer, SimulatedAnswer)
+        assert configured == 'configured'
+        assert isinstance(default, Letz)
+        assert self.clock.time() == 9
+        assert self.load_model.calls == 3
+
+    def test_side_effect(self):
+        tester = Mock()
+
+        ###
+        when(tester).has_a_call(call.method(1)).under_load(self.load_model).then_return('first').then_return('second')
+        when(tester).has_a_call(call.method(2)).then_return('unloaded')
+        answers = [tester.method(1), tester.method(1), tester.method(2)]
+        ###
+
+        assert answers == ['first', 'second', 'unloaded']
+        assert self.clock.time() == 6
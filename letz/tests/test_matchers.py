@@ -0,0 +1,258 @@
+import re
+
+from mock import Mock, call
+from pytest import raises
+
+from letz.aliases import when, verify, verify_no_more_interactions, recorded, times, in_order, any_, eq, instance_of, \
+    gt, lt, contains, regex, arg_that, all_of, any_of, captor
+from letz.core import LetzController, AnswerConfigurationAction
+from letz.matchers import compile_call
+
+
+class TestMatchers(object):
+    def test_any(self):
+        assert any_() == 1
+        assert any_() == [1]
+
+    def test_eq(self):
+        assert eq([1]) == [1]
+        assert eq([1]) != [2]
+
+    def test_instance_of(self):
+        assert instance_of(int) == 1
+        assert instance_of(int) != '1'
+
+    def test_comparisons(self):
+        assert gt(1) == 2
+        assert gt(1) != 1
+        assert lt(1) == 0
+        assert lt(1) != 1
+        assert gt(1) != object()
+
+    def test_contains(self):
+        assert contains(1) == [1, 2]
+        assert contains('b') == 'abc'
+        assert contains(1) != [2]
+        assert contains(1) != 1
+
+    def test_regex(self):
+        assert regex(r'^a\d') == 'a1'
+        assert regex(re.compile('b', re.IGNORECASE)) == 'aB'
+        assert regex('a') != 'b'
+        assert regex('a') != 1
+
+    def test_arg_that(self):
+        assert arg_that(lambda value: value % 2) == 3
+        assert arg_that(lambda value: value % 2) != 2
+
+    def test_all_of(self):
+        assert all_of(instance_of(int), gt(1), 3) == 3
+        assert all_of(instance_of(int), gt(1)) != 1
+
+    def test_any_of(self):
+        assert any_of(1, regex('a')) == 1
+        assert any_of(1, regex('a')) == 'ab'
+        assert any_of(1, regex('a')) != 2
+
+    def test_captor(self):
+        argument_captor = captor()
+        with raises(ValueError):
+            argument_captor.value
+
+        argument_captor.capture(1)
+        argument_captor.capture(2)
+        assert argument_captor.values == [1, 2]
+        assert argument_captor.value == 2
+
+
+class TestCallMatchPlan(object):
+    def test_matches(self):
+        match_plan = compile_call((1, instance_of(str)), {'key': gt(1)})
+
+        assert match_plan.matches((1, 'a'), {'key': 2})
+        assert not match_plan.matches((2, 'a'), {'key': 2})
+        assert not match_plan.matches((1, 2), {'key': 2})
+        assert not match_plan.matches((1, 'a'), {'key': 1})
+        assert not match_plan.matches((1, 'a'), {'other_key': 2})
+        assert not match_plan.matches((1, 'a'), {})
+        assert not match_plan.matches((1,), {'key': 2})
+
+    def test_cheap_checks_first(self):
+        checked = []
+        match_plan = compile_call((arg_that(checked.append), 1), {})
+
+        assert not match_plan.matches(('a', 2), {})
+        assert not match_plan.matches(('a',), {})
+        assert checked == []
+
+    def test_drop_any(self):
+        match_plan = compile_call((any_(), any_of(any_(), 1), 1), {})
+
+        assert match_plan.matchers == []
+        assert match_plan.matches(('a', 'b', 1), {})
+
+    def test_capture_only_matching_calls(self):
+        argument_captor = captor()
+        match_plan = compile_call((argument_captor, gt(1)), {'key': all_of(instance_of(str), argument_captor)})
+
+        assert not match_plan.matches(('a', 1), {'key': 'b'})
+        assert match_plan.matches(('c', 2), {'key': 'd'})
+        assert argument_captor.values == ['c', 'd']
+
+
+class TestWhenMatchers(object):
+    def test_should_stub_with_matchers(self):
+        tester = Mock()
+        when(tester).has_a_call(call.method(any_(), key=regex('^a'))).then_return('any')
+        when(tester).has_a_call(call.method(gt(10), key=contains('b'))).then_return('greater')
+
+        assert tester.method(1, key='ab') == 'any'
+        assert tester.method(11, key='ab') == 'greater'
+        assert tester.method(1, key='b') is None
+        assert tester.method(1) is None
+
+    def test_should_capture_stubbed_calls(self):
+        tester = Mock()
+        argument_captor = captor()
+        when(tester).has_a_call(call.method(argument_captor, 1)).then_return('captured')
+
+        tester.method('a', 1)
+        tester.method('b', 2)
+
+        assert argument_captor.values == ['a']
+
+    def test_should_verify_with_matchers(self):
+        tester = Mock()
+        tester.method(1, key='ab')
+        tester.method(20, key='ab')
+
+        verify(tester, times(2)).had_called_with(call.method(instance_of(int), key=regex('b$')))
+        verify(tester).had_called_with(call.method(gt(10), key=any_()))
+
+
+class TestSignatureMatchingAnswerMatchers(object):
+    def test_call(self):
+        letz_controller = LetzController()
+        tester = letz_controller.create_letz()
+        tester_engine = letz_controller.get_engine(tester)
+        tester_engine._call_action = AnswerConfigurationAction(lambda *_, **__: 'matched')
+        tester(lt(0), any_of('a', 'b'))
+
+        assert [tester(-1, 'a'), tester(-1, 'c'), tester(1, 'b')] == ['matched', None, None]
+
+
+class TestArgumentCaptor(object):
+    def test_limit(self):
+        argument_captor = captor(limit=2)
+        for value in range(5):
+            argument_captor.capture(value)
+
+        assert argument_captor.values == [3, 4]
+        assert argument_captor.captured_count == 5
+
+    def test_callable_sink(self):
+        sunk = []
+        argument_captor = captor(sink=sunk.append)
+
+        argument_captor.capture(1)
+        argument_captor.capture(2)
+        assert sunk == [1, 2]
+        assert argument_captor.values == []
+
+    def test_generator_sink(self):
+        totals = []
+
+        def summing_sink():
+            total = 0
+            while True:
+                total += yield
+                totals.append(total)
+
+        argument_captor = captor(sink=summing_sink(), limit=1)
+        argument_captor.capture(1)
+        argument_captor.capture(2)
+
+        assert totals == [1, 3]
+        assert argument_captor.value == 2
+
+    def test_should_capture_verified_calls_only(self):
+        tester = Mock()
+        argument_captor = captor()
+        tester.write('a', 1)
+        tester.write('b', 2)
+        tester.read('c', 1)
+
+        verify(tester).had_called_with(call.write(argument_captor, 1))
+
+        assert argument_captor.values == ['a']
+
+    def test_should_not_capture_when_compared(self):
+        argument_captor = captor()
+
+        assert argument_captor == 'a'
+        assert argument_captor.values == []
+
+    def test_should_capture_verified_calls_once(self):
+        tester = Mock()
+        sunk = []
+        argument_captor = captor(sink=sunk.append)
+        tester.write('a')
+        tester.write('b')
+
+        verify(tester, times(2)).had_called_with(call.write(argument_captor))
+        verify_no_more_interactions(tester)
+
+        assert sunk == ['a', 'b']
+        assert argument_captor.captured_count == 2
+
+    def test_should_capture_calls_verified_in_order(self):
+        tester = Mock()
+        argument_captor = captor()
+        in_order_verifier = in_order(tester)
+        tester.write('a')
+        tester.read()
+        tester.write('b')
+
+        in_order_verifier.verify(tester).had_called_with(call.write(argument_captor))
+        in_order_verifier.verify(tester).had_called_with(call.read())
+
+        assert argument_captor.values == ['a']
+
+    def test_should_drop_captured_calls(self):
+        tester = Mock()
+        sunk = []
+        when(tester).has_a_call(call.write(captor(sink=sunk.append, drop_calls=True))).then_return('written')
+
+        assert tester.write(['payload']) == 'written'
+        tester.write(1, 2)
+        tester.read()
+
+        assert sunk == [['payload']]
+        assert tester.mock_calls == [call.write(1, 2), call.read()]
+        assert tester.method_calls == [call.write(1, 2), call.read()]
+        assert tester.write.mock_calls == [call(1, 2)]
+        assert tester.write.call_args_list == [call(1, 2)]
+        assert tester.write.call_args == call(1, 2)
+
+    def test_should_drop_only_the_captured_call(self):
+        for tester in (Mock(), recorded(Mock())):
+            when(tester).has_a_call(call.write(data=captor(limit=1, drop_calls=True))).then_return('written')
+
+            tester.write.flush()
+            assert tester.write(data='big') == 'written'
+
+            assert tester.write.method_calls == [call.flush()]
+            assert tester.method_calls == [call.write.flush()]
+            assert tester.mock_calls == [call.write.flush()]
+
+    def test_should_drop_captured_calls_from_recorded_mocks(self):
+        tester = recorded(Mock())
+        argument_captor = captor(limit=1, drop_calls=True)
+        when(tester).has_a_call(call.write(argument_captor)).then_return('written')
+
+        for index in range(100):
+            tester.write([index])
+
+        assert argument_captor.values == [[99]]
+        assert len(tester.mock_calls) == 0
+        verify_no_more_interactions(tester)
@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+import pickle
+
+from pytest import raises
+from tstcls import TestClassBase
+
+from letz.clocks import VirtualClock
+from letz.core import LetzController, Call, CallableLetz
+from letz.exceptions import MocksException
+from letz.load import LoadModel
+from letz.processes import CallCollector
+from letz.recording import keep_compact
+
+
+def call_letz(letz, value):
+    letz.service.method(value)
+    letz.created_in_worker(value)
+    return os.getpid()
+
+
+class TestCallCollector(TestClassBase):
+    def setup_test(self, **fixtures):
+        self.letz_controller = LetzController()
+        self.tester = self.letz_controller.create_letz()
+        self.tester.service.method(0)
+        self.collector = CallCollector()
+        self.collector.track(self.tester)
+
+    def teardown_test(self, **fixtures):
+        self.collector.close()
+
+    def test_pickled_copy(self):
+        self.letz_controller.set_constant_answer(self.tester.service.method, 'answer')
+
+        ###
+        copy = pickle.loads(pickle.dumps(self.tester))
+        answer = copy.service.method(1, key='value')
+        copy()(2)
+        self.collector.flush()
+        ###
+
+        assert isinstance(copy, CallableLetz)
+        assert answer == 'answer'
+        assert self.tester.service.method.__engine__.calls_log == [Call(0), Call(1, key='value')]
+        assert self.tester().__engine__.calls_log == [Call(2)]
+        assert [name for _, name, _ in self.collector.records] == ['letz0.service.method', 'letz0', 'letz0.()']
+        with raises(MocksException):
+            copy.service.method.__engine__.count_calls(Call(1))
+
+    def test_processes(self):
+        processes = [multiprocessing.Process(target=call_letz, args=(self.tester, value)) for value in range(1, 4)]
+
+        ###
+        for process in processes:
+            process.start()
+            process.join()
+        self.collector.flush()
+        ###
+
+        assert self.tester.service.method.__engine__.calls_log == [Call(0), Call(1), Call(2), Call(3)]
+        assert self.tester.created_in_worker.__engine__.calls_log == [Call(1), Call(2), Call(3)]
+        assert [process_id for process_id, _, _ in self.collector.records] == \
+            [process.pid for process in processes for _ in range(2)]
+
+    def test_merged_order(self):
+        letz_controller = LetzController(recording_policy=keep_compact())
+        tester = self.collector.track(letz_controller.create_letz())
+        copy = pickle.loads(pickle.dumps(tester))
+
+        ###
+        tester.first(1)
+        copy.second(2)
+        self.collector.flush()
+        tester.first(3)
+        ###
+
+        records = sorted(list(tester.first.__engine__.calls_log.records()) +
+                         list(tester.second.__engine__.calls_log.records()))
+        assert [call for _, _, call in records] == [Call(1), Call(2), Call(3)]
+
+    def test_concurrent_letz(self):
+        tester = self.collector.track(LetzController(concurrent=True).create_letz())
+
+        copy = pickle.loads(pickle.dumps(tester))
+        copy.method(1)
+        self.collector.flush()
+
+        assert tester.method.__engine__.calls_log == [Call(1)]
+
+    def test_uncollected_calls(self):
+        copy = pickle.loads(pickle.dumps(self.tester))
+
+        ###
+        copy.service.method(lambda: 1)
+        copy.service.method('x' * (2 << 20))
+        copy.service.method(1)
+        with raises(MocksException) as error:
+            self.collector.flush()
+        ###
+
+        assert '2 calls were not collected' in str(error.value)
+        assert 'letz0.service.method' in str(error.value)
+        assert self.collector.failed_count == 2
+        assert self.tester.service.method.__engine__.calls_log == [Call(0), Call(1)]
+        self.collector.flush()
+
+    def test_collect_errors(self):
+        copy = pickle.loads(pickle.dumps(self.tester))
+        self.tester.__engine__.attributes['service'].deleted = True
+
+        ###
+        copy.service.method(1)
+        copy.other(2)
+        with raises(MocksException) as error:
+            self.collector.flush()
+        ###
+
+        assert 'AttributeError' in str(error.value)
+        assert self.collector.failed_count == 1
+        assert self.tester.other.__engine__.calls_log == [Call(2)]
+
+    def test_simulated_load(self):
+        load_model = LoadModel(latency=2, clock=VirtualClock())
+        self.letz_controller.set_constant_answer(self.tester.service.method, 'answer')
+        self.letz_controller.simulate_load(self.tester.service.method, load_model)
+
+        ###
+        copy = pickle.loads(pickle.dumps(self.tester))
+        answer = copy.service.method(1)
+        ###
+
+        copied_model = copy.service.method.__engine__.answer.load_model
+        assert answer == 'answer'
+        assert copied_model.calls == 1
+        assert copied_model.clock.time() == 2
+        assert load_model.calls == 0
+
+    def test_untracked_letz(self):
+        with raises(pickle.PicklingError):
+            pickle.dumps(self.letz_controller.create_letz())
+
+    def test_close(self):
+        ###
+        self.collector.close()
+        ###
+
+        assert self.tester.__engine__.remote is None
+        assert self.tester.service.method.__engine__.remote is None
+        with raises(pickle.PicklingError):
+            pickle.dumps(self.tester)
@@ -0,0 +1,145 @@
+from mock import call
+from pytest import fixture, mark
+
+from letz.aliases import times
+from letz.core import LetzController
+from letz.pytest_plugin import LetzControllerPool, LetzInteractionsWarning, LetzSession, letz, when, verify
+from letz.recording import KEEP_ALL, keep_compact
+
+
+class TestLetzControllerPool(object):
+    def test_reuse_reset_controllers(self):
+        pool = LetzControllerPool()
+        letz_controller = pool.acquire()
+        tester = letz_controller.create_letz()
+        tester.some_attribute(1)
+        del tester
+
+        ###
+        pool.release(letz_controller)
+        ###
+
+        assert pool.acquire() is letz_controller
+        assert len(letz_controller.letzim) == 0
+
+    def test_drop_controllers_with_live_letzim(self):
+        pool = LetzControllerPool()
+        letz_controller = pool.acquire()
+        tester = letz_controller.create_letz()
+        tester.some_attribute(1)
+
+        ###
+        pool.release(letz_controller)
+        ###
+
+        assert pool.acquire() is not letz_controller
+        assert len(tester.__engine__.calls_log) == 0
+        letz_controller.set_constant_answer(tester, 'answer')
+        assert tester() == 'answer'
+
+    def test_forget_letzim_held_by_owner(self):
+        pool = LetzControllerPool()
+        letz_controller = pool.acquire()
+        owner = TestLetzControllerPool()
+        owner.testers = [letz_controller.create_letz()]
+        owner.testers[0].some_attribute(1)
+
+        ###
+        pool.release(letz_controller, owner)
+        ###
+
+        assert pool.acquire() is letz_controller
+        assert len(letz_controller.letzim) == 0
+        assert len(owner.testers[0].__engine__.calls_log) == 0
+
+    def test_restore_released_controllers(self):
+        pool = LetzControllerPool()
+        letz_controller = pool.acquire(recording_policy=keep_compact())
+        letz_controller.enable_stats()
+        tester = letz_controller.create_letz()
+        letz_controller.set_constant_answer(tester, 'answer')
+        tester(1)
+        del tester
+
+        ###
+        pool.release(letz_controller)
+        ###
+
+        assert pool.free[False] == [letz_controller]
+        assert letz_controller.stats_collector is None
+        assert letz_controller.recording_policy is KEEP_ALL
+        tester = letz_controller.create_letz()
+        assert 'get_answer' not in vars(tester.__engine__)
+
+    def test_separate_concurrent_controllers(self):
+        pool = LetzControllerPool()
+        concurrent_controller = pool.acquire(concurrent=True)
+        pool.release(concurrent_controller)
+
+        assert pool.acquire() is not concurrent_controller
+        assert pool.acquire(concurrent=True) is concurrent_controller
+
+    def test_bounded_size(self):
+        pool = LetzControllerPool(size=1)
+        letz_controllers = [pool.acquire(), pool.acquire()]
+
+        ###
+        for letz_controller in letz_controllers:
+            pool.release(letz_controller)
+        ###
+
+        assert pool.free[False] == letz_controllers[:1]
+
+
+class TestLetzSession(object):
+    def test_report_unverified_calls(self):
+        session = LetzSession(LetzController())
+        created_mock = session.mock()
+        verified_mock = session.mock()
+        created_mock.method(1)
+        verified_mock.method(1)
+        verified_mock.method(2)
+
+        session.verify(verified_mock).had_called_with(call.method(1))
+        report = session.get_report()
+
+        assert 'call.method(1) x 1' in report
+        assert 'call.method(2) x 1' in report
+        assert len(report.splitlines()) == 4
+
+    def test_report_spec_mocks(self):
+        session = LetzSession(LetzController())
+        spec_mock = session.mock(spec=['method'])
+        spec_mock.method(1)
+
+        assert 'call.method(1) x 1' in session.get_report()
+
+    def test_report_leaked_letzim(self):
+        session = LetzSession(LetzController())
+        tester = session.create()
+
+        assert session.get_report() == '1 letzim are still referenced after the test'
+        assert session.get_report(check_leaks=False) is None
+        del tester
+        assert session.get_report() is None
+
+
+def test_fixtures(letz, when, verify):
+    tester = letz.mock()
+    when(tester).has_a_call(call.method(1)).then_return('one')
+
+    assert tester.method(1) == 'one'
+    assert letz.create()(1) is not None
+
+    verify(tester, times(1)).had_called_with(call.method(1))
+
+
+@mark.filterwarnings('error::{}.{}'.format(LetzInteractionsWarning.__module__, LetzInteractionsWarning.__name__))
+class TestClassFixtures(object):
+    @fixture(autouse=True)
+    def setup(self, letz):
+        self.tester = letz.create()
+        self.tester.some_attribute.return_value = 'value'
+
+    def test_keep_letzim_on_instance(self):
+        assert self.tester.some_attribute.return_value == 'value'
@@ -2,7 +2,7 @@ from os import path
 
 from setuptools import setup, find_packages
 
-REQUIREMENTS = ['mock', 'future', 'typing']
+REQUIREMENTS = ['mock', 'typing', 'funcsigs; python_version < "3.3"']
 
 this_directory = path.abspath(path.dirname(__file__))
 with open(path.join(this_directory, 'README.md'), 'rb') as f:
@@ -21,7 +21,8 @@ setup(
     url='https://github.com/singular-labs/letz',
     keywords="letz, mock, test, python",
     install_requires=REQUIREMENTS,
-    tests_require=['pytest', 'pytest-parametrization', 'pytest-tstcls'],
+    entry_points={'pytest11': ['letz = letz.pytest_plugin']},
+    tests_require=['pytest', 'pytest-parametrization', 'pytest-tstcls', 'pytest-benchmark'],
     license="MIT License",
     python_requires='>=2.6, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*',
     include_package_data=True,